@@ -6,15 +6,23 @@ import logging
 import time
 import json
 import glob
+from bisect import bisect_right
+from urllib.parse import quote
 from datetime import datetime
 try:
     import pandas as pd
 except ImportError:
     # For development purposes, we'll handle missing pandas later
     pd = None
-from flask import Flask, render_template_string, render_template, request, redirect, url_for, flash, send_from_directory, session
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library parser
+    orjson = None
+from flask import Flask, Response, render_template_string, render_template, request, redirect, url_for, flash, send_from_directory, session, abort
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import case, func
+from sqlalchemy.orm import DeclarativeBase, selectinload
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 
@@ -542,6 +550,16 @@ OUTPUT_DIR = 'output'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Download offloading
+# Behind Apache (mod_xsendfile) set USE_X_SENDFILE=true; behind nginx set
+# X_ACCEL_REDIRECT_PREFIX to an `internal` location aliased to the output
+# directory (e.g. /_protected/), and X_ACCEL_REDIRECT_ETL_PREFIX to one aliased
+# to the ETL's OUTPUT_DIR if that is a different directory. With neither set,
+# files are streamed by Flask itself.
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
+X_ACCEL_REDIRECT_ETL_PREFIX = os.environ.get('X_ACCEL_REDIRECT_ETL_PREFIX') or X_ACCEL_REDIRECT_PREFIX
+
 # Initialize the app with the extension
 db.init_app(app)
 
@@ -549,18 +567,48 @@ db.init_app(app)
 from etl.sync import run_etl
 from etl.extract import extract_data
 from etl.transform import transform_data, prepare_stats_data, prepare_working_data
-from etl.load import (
-    load_geo_db, 
-    create_stats_db, load_stats_data,
-    create_working_db, load_working_data
-)
-from etl.utils import get_memory_usage, get_memory_usage_value, get_cpu_usage, format_elapsed_time, check_file_size
+from etl.load import load_all
+from config import OUTPUT_DIR as ETL_OUTPUT_DIR
+from etl.utils import get_memory_usage, get_memory_usage_value, get_cpu_usage, format_elapsed_time, check_file_size, PeakMemorySampler
+
+# Directories files can be downloaded from, mapped to their X-Accel-Redirect
+# prefix; the app's own output directory wins if both are the same directory
+DOWNLOAD_ROOTS = {
+    os.path.realpath(ETL_OUTPUT_DIR): X_ACCEL_REDIRECT_ETL_PREFIX,
+    os.path.realpath(OUTPUT_DIR): X_ACCEL_REDIRECT_PREFIX,
+}
+
+def load_json_file(path):
+    """Load a JSON file, using orjson when it is available."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
 
 # Helper function to check allowed file extensions
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Heatmap color scale: red (0%) -> orange (25%) -> yellow (50%) -> light blue (75%) -> dark blue (100%)
+# Each segment is precomputed as (start value, start rgb, rgb slope per percentage point)
+_COLOR_STOPS = ((0, (178, 24, 43)), (25, (178, 96, 43)), (50, (244, 165, 130)),
+                (75, (146, 197, 222)), (100, (33, 102, 172)))
+_COLOR_BREAKS = tuple(v for v, _ in _COLOR_STOPS[:-1])
+_COLOR_SEGMENTS = tuple(
+    (v0, rgb0, tuple((c1 - c0) / (v1 - v0) for c0, c1 in zip(rgb0, rgb1)))
+    for (v0, rgb0), (v1, rgb1) in zip(_COLOR_STOPS, _COLOR_STOPS[1:])
+)
+
+def get_color(value):
+    """Generate a color from red (0%) to blue (100%)"""
+    # Ensure value is between 0 and 100
+    value = max(0, min(100, value))
+    v0, (r0, g0, b0), (dr, dg, db) = _COLOR_SEGMENTS[bisect_right(_COLOR_BREAKS, value) - 1]
+    t = value - v0
+    return f'rgb({int(r0 + dr * t)}, {int(g0 + dg * t)}, {int(b0 + db * t)})'
+
 # Initialize the database tables
 with app.app_context():
     # Import models module now that db is initialized
@@ -646,10 +694,15 @@ def run_job(job_id):
     # Get the job
     job = ETLJob.query.get_or_404(job_id)
     
-    # Update job status
+    # Update job status (committed now so the UI can show the job as running;
+    # stage metrics are committed as each stage starts and ends, so the write
+    # lock on the app database is never held across a whole stage)
     job.status = 'running'
     db.session.commit()
     
+    # Peak memory sampler for file upload jobs (run_etl tracks its own)
+    memory_sampler = PeakMemorySampler()
+    
     try:
         if job.source_type == 'sql_server':
             # Run ETL from SQL Server
@@ -674,7 +727,7 @@ def run_job(job_id):
             
             # Record performance metrics
             start_time = time.time()
-            peak_memory = get_memory_usage_value()
+            memory_sampler.start()
             
             # Start extraction phase
             extraction_start = time.time()
@@ -702,7 +755,6 @@ def run_job(job_id):
             
             extraction_time = time.time() - extraction_start
             current_memory = get_memory_usage_value()
-            peak_memory = max(peak_memory, current_memory)
             
             if df is not None:
                 # Record count
@@ -744,7 +796,6 @@ def run_job(job_id):
                     
                     transformation_time = time.time() - transformation_start
                     current_memory = get_memory_usage_value()
-                    peak_memory = max(peak_memory, current_memory)
                     
                     # Create performance metric record for transformation end
                     metric = PerformanceMetric(
@@ -784,16 +835,11 @@ def run_job(job_id):
                     stats_db_path = os.path.join(OUTPUT_DIR, f"stats_db_{timestamp}.sqlite")
                     working_db_path = os.path.join(OUTPUT_DIR, f"working_db_{timestamp}.sqlite")
                     
-                    # Load data
-                    load_geo_db(gdf, geo_db_path)
-                    create_stats_db(stats_db_path)
-                    load_stats_data(stats_df, stats_db_path)
-                    create_working_db(working_db_path)
-                    load_working_data(working_df, working_db_path)
+                    # Load data into the three outputs concurrently
+                    load_all(gdf, stats_df, working_df, geo_db_path, stats_db_path, working_db_path)
                     
                     loading_time = time.time() - loading_start
                     current_memory = get_memory_usage_value()
-                    peak_memory = max(peak_memory, current_memory)
                     
                     # Create performance metric record for loading end
                     metric = PerformanceMetric(
@@ -815,7 +861,7 @@ def run_job(job_id):
                     job.extraction_time = extraction_time
                     job.transformation_time = transformation_time
                     job.loading_time = loading_time
-                    job.peak_memory_usage = peak_memory
+                    job.peak_memory_usage = memory_sampler.stop()
                 else:
                     raise ValueError("Input file does not contain a 'geometry' column with WKT strings")
             else:
@@ -871,9 +917,14 @@ def run_job(job_id):
     except Exception as e:
         # Handle errors in the main ETL process
         logger.error(f"ETL job {job.id} failed: {str(e)}", exc_info=True)
+        if not db.session.is_active:
+            # A failed commit invalidates the transaction; roll back so the status can be saved
+            db.session.rollback()
         job.status = 'failed'
         job.end_time = datetime.utcnow()
         job.error_message = str(e)
+    finally:
+        memory_sampler.stop()
     
     # Save the job
     db.session.commit()
@@ -882,12 +933,9 @@ def run_job(job_id):
 
 @app.route('/job/<int:job_id>')
 def job_detail(job_id):
-    # Get the job
-    job = ETLJob.query.get_or_404(job_id)
-    
-    # Get performance metrics
-    from models import PerformanceMetric
-    metrics = PerformanceMetric.query.filter_by(job_id=job.id).order_by(PerformanceMetric.timestamp).all()
+    # Get the job with its performance metrics (ordered by timestamp) in one round trip
+    job = ETLJob.query.options(selectinload(ETLJob.performance_metrics)).filter_by(id=job_id).first_or_404()
+    metrics = job.performance_metrics
     
     # Get file sizes
     if job.geo_db_path and os.path.exists(job.geo_db_path):
@@ -953,15 +1001,13 @@ def data_quality_heatmap():
     
     if heatmap_file and os.path.exists(heatmap_file):
         try:
-            with open(heatmap_file, 'r') as f:
-                heatmap_data = json.load(f)
+            heatmap_data = load_json_file(heatmap_file)
             
             # Extract column details from the full quality report
             quality_report_file = heatmap_file.replace('_heatmap_', '_')
             if os.path.exists(quality_report_file):
-                with open(quality_report_file, 'r') as f:
-                    quality_report = json.load(f)
-                    column_details = quality_report.get('columns', {})
+                quality_report = load_json_file(quality_report_file)
+                column_details = quality_report.get('columns', {})
         except Exception as e:
             app.logger.error(f"Error loading heatmap data: {str(e)}")
     
@@ -983,35 +1029,6 @@ def data_quality_heatmap():
     record_count = job.record_count or 0
     analysis_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
     
-    # Helper function for Jinja to compute colors
-    def get_color(value):
-        """Generate a color from red (0%) to blue (100%)"""
-        # Ensure value is between 0 and 100
-        value = max(0, min(100, value))
-        
-        if value < 25:
-            # Red to orange (0-25%)
-            r = 178
-            g = 24 + (value / 25) * (96 - 24)
-            b = 43
-        elif value < 50:
-            # Orange to yellow (25-50%)
-            r = 178 + (value - 25) / 25 * (244 - 178)
-            g = 96 + (value - 25) / 25 * (165 - 96)
-            b = 43 + (value - 25) / 25 * (130 - 43)
-        elif value < 75:
-            # Yellow to light blue (50-75%)
-            r = 244 - (value - 50) / 25 * (244 - 146)
-            g = 165 + (value - 50) / 25 * (197 - 165)
-            b = 130 + (value - 50) / 25 * (222 - 130)
-        else:
-            # Light blue to dark blue (75-100%)
-            r = 146 - (value - 75) / 25 * (146 - 33)
-            g = 197 - (value - 75) / 25 * (197 - 102)
-            b = 222 - (value - 75) / 25 * (222 - 172)
-            
-        return f'rgb({int(r)}, {int(g)}, {int(b)})'
-    
     return render_template(
         'data_quality_heatmap.html',
         job_id=job.id if job else None,
@@ -1034,23 +1051,42 @@ def data_quality_heatmap():
 
 @app.route('/performance-dashboard')
 def performance_dashboard():
-    # Get all completed jobs
-    jobs = ETLJob.query.filter_by(status='completed').order_by(ETLJob.end_time.desc()).all()
-    
-    # Calculate averages for completed jobs with performance metrics
-    valid_jobs = [job for job in jobs if job.extraction_time and job.transformation_time and job.loading_time and job.record_count]
+    # Completed jobs with performance metrics (filtered in SQL)
+    valid_filter = (
+        ETLJob.status == 'completed',
+        ETLJob.extraction_time > 0,
+        ETLJob.transformation_time > 0,
+        ETLJob.loading_time > 0,
+        ETLJob.record_count > 0,
+    )
+    valid_jobs = ETLJob.query.filter(*valid_filter).order_by(ETLJob.end_time.desc()).all()
     
     if valid_jobs:
-        avg_extraction_time = sum(job.extraction_time for job in valid_jobs) / len(valid_jobs)
-        avg_transformation_time = sum(job.transformation_time for job in valid_jobs) / len(valid_jobs)
-        avg_loading_time = sum(job.loading_time for job in valid_jobs) / len(valid_jobs)
-        avg_duration = sum(job.duration() for job in valid_jobs) / len(valid_jobs)
-        avg_records = sum(job.record_count for job in valid_jobs) / len(valid_jobs)
-        avg_memory = sum(job.peak_memory_usage for job in valid_jobs if job.peak_memory_usage) / len(valid_jobs) if any(job.peak_memory_usage for job in valid_jobs) else 0
+        # Aggregate the stored columns in a single SELECT
+        has_memory = ETLJob.peak_memory_usage > 0
+        totals = db.session.query(
+            func.sum(ETLJob.extraction_time),
+            func.sum(ETLJob.transformation_time),
+            func.sum(ETLJob.loading_time),
+            func.sum(ETLJob.record_count),
+            func.sum(case((has_memory, ETLJob.peak_memory_usage), else_=0)),
+            func.sum(case((has_memory, ETLJob.peak_memory_usage / ETLJob.record_count), else_=0)),
+        ).filter(*valid_filter).one()
+        job_count = len(valid_jobs)
+        avg_extraction_time, avg_transformation_time, avg_loading_time, avg_records, avg_memory, avg_memory_per_record = (
+            float(total or 0) / job_count for total in totals
+        )
         
-        # Calculate derived metrics
-        avg_throughput = sum(job.throughput() for job in valid_jobs if job.throughput()) / len(valid_jobs) if any(job.throughput() for job in valid_jobs) else 0
-        avg_memory_per_record = sum(job.peak_memory_usage / job.record_count for job in valid_jobs if job.peak_memory_usage and job.record_count) / len(valid_jobs) if any(job.peak_memory_usage and job.record_count for job in valid_jobs) else 0
+        # Duration and throughput depend on timestamp arithmetic, so compute them in one pass
+        total_duration = 0
+        total_throughput = 0
+        for job in valid_jobs:
+            duration = job.duration()
+            total_duration += duration
+            if duration:
+                total_throughput += job.record_count / duration
+        avg_duration = total_duration / job_count
+        avg_throughput = total_throughput / job_count
     else:
         avg_extraction_time = 0
         avg_transformation_time = 0
@@ -1092,11 +1128,32 @@ def performance_dashboard():
 
 @app.route('/download/<path:filename>')
 def download_file(filename):
-    # Extract directory from the filename
-    directory = os.path.dirname(filename)
-    file = os.path.basename(filename)
+    # Only files inside the output directories can be downloaded; the most
+    # specific matching directory decides the X-Accel-Redirect prefix
+    path = os.path.realpath(filename)
+    roots = [root for root in DOWNLOAD_ROOTS if os.path.commonpath([root, path]) == root]
+    if not roots or not os.path.isfile(path):
+        abort(404)
+    root = max(roots, key=len)
+    file = os.path.basename(path)
+    
+    prefix = DOWNLOAD_ROOTS[root]
+    if prefix:
+        # Let nginx serve the file with sendfile(2) instead of copying it through Python;
+        # the redirect names the validated file relative to the directory nginx aliases
+        relative_path = os.path.relpath(path, root).replace(os.sep, '/')
+        response = Response()
+        response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{quote(relative_path)}"
+        response.headers['Content-Disposition'] = (
+            f"attachment; filename=\"{secure_filename(file) or 'download'}\"; "
+            f"filename*=UTF-8''{quote(file)}"
+        )
+        # Let nginx pick the content type from the file extension
+        del response.headers['Content-Type']
+        return response
     
-    return send_from_directory(directory, file, as_attachment=True)
+    # Dev-server fallback (also honours USE_X_SENDFILE for Apache)
+    return send_from_directory(os.path.dirname(path), file, as_attachment=True)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -6,6 +6,7 @@ This script creates backups of database files with timestamps,
 useful for scheduled backups in CI/CD pipelines.
 """
 import os
+import re
 import sys
 import shutil
 import logging
@@ -23,6 +24,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger('BackupScript')
 
+# Timestamped ETL outputs (e.g. geo_db_20250101120000.gpkg) are written once and
+# never modified, so they can be hardlinked into a backup instead of copied.
+IMMUTABLE_OUTPUT_PATTERN = re.compile(r'_\d{14}\.(gpkg|sqlite|db)$')
+
+def snapshot_file(file_path, target_path):
+    """
+    Snapshot a file into the backup directory.
+    
+    Immutable timestamped outputs are hardlinked (no bytes copied) when the backup
+    lives on the same filesystem; everything else, or a cross-device link, falls
+    back to a full copy. Mutable databases are always copied, since a hardlink
+    would keep tracking later writes to the source.
+    
+    Returns:
+        str: 'linked' or 'copied'
+    """
+    if IMMUTABLE_OUTPUT_PATTERN.search(file_path.name):
+        try:
+            os.link(file_path, target_path)
+            return 'linked'
+        except OSError:
+            pass
+    shutil.copy2(file_path, target_path)
+    return 'copied'
+
 def backup_databases():
     """
     Create timestamped backups of database files.
@@ -63,11 +89,11 @@ def backup_databases():
                     target_dir = backup_subdir / rel_path.parent
                     target_dir.mkdir(parents=True, exist_ok=True)
                     
-                    # Copy file
+                    # Link or copy file
                     target_path = target_dir / file_path.name
                     try:
-                        shutil.copy2(file_path, target_path)
-                        logger.info(f"Backed up {file_path} -> {target_path}")
+                        method = snapshot_file(file_path, target_path)
+                        logger.info(f"Backed up {file_path} -> {target_path} ({method})")
                         backed_up_files.append(str(rel_path))
                     except Exception as e:
                         logger.error(f"Failed to backup {file_path}: {e}")
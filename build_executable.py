@@ -5,34 +5,76 @@
 Build script for creating a standalone executable of CountyDataSync using PyInstaller.
 
 Usage:
-    python build_executable.py
+    python build_executable.py [--clean] [--optimize]
+
+Arguments:
+    --clean: Clear PyInstaller's cache before building. By default the cached
+             analysis is reused so only changed modules are rebuilt; delete the
+             build/ and dist/ directories to force a completely fresh build.
+    --optimize: Bundle bytecode compiled with PYTHONOPTIMIZE=2 (no asserts or
+                docstrings) for a smaller executable. Implies --clean so that
+                bytecode cached from a non-optimized build is not reused.
 """
 
+import argparse
 import os
 import subprocess
 import sys
 import platform
+import hashlib
+from collections import deque
+
+from check_packaging_readiness import get_pyinstaller_version, is_python_version_supported, which
+
+BUILD_CACHE_DIR = '.build_cache'
+
+
+def get_executable_path():
+    """Return the path PyInstaller writes the onefile executable to."""
+    return os.path.join('dist', 'CountyDataSync' + ('.exe' if platform.system() == 'Windows' else ''))
+
+
+def _prereqs_marker_path():
+    """Return the prerequisites marker path keyed by the requirements.txt hash."""
+    try:
+        with open('requirements.txt', 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+    return os.path.join(BUILD_CACHE_DIR, f"prereqs_ok_{digest}")
 
 
 def check_prerequisites():
     """Check if all prerequisites are installed."""
+    # Skip the import probing if this requirements.txt has already been verified
+    marker = _prereqs_marker_path()
+    if marker and os.path.exists(marker):
+        print("All prerequisites are met (cached).")
+        return True
+    
     # Check Python version
-    python_version = sys.version_info
-    if python_version.major < 3 or (python_version.major == 3 and python_version.minor < 7):
+    if not is_python_version_supported():
         print("Error: Python 3.7 or higher is required.")
         return False
     
     # Check if PyInstaller is installed
-    try:
-        import PyInstaller
-        print(f"PyInstaller {PyInstaller.__version__} found.")
-    except ImportError:
+    pyinstaller_version = get_pyinstaller_version()
+    if pyinstaller_version:
+        print(f"PyInstaller {pyinstaller_version} found.")
+    else:
         print("Error: PyInstaller is not installed. Install it with 'pip install pyinstaller'.")
         return False
     
     # Since we've installed all required packages and verified it with
     # check_packaging_readiness.py, we can skip detailed package checks here
     print("All prerequisites are met.")
+    
+    if marker:
+        try:
+            os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+            open(marker, 'a').close()
+        except OSError as e:
+            print(f"Warning: could not write prerequisites cache: {e}")
     return True
 
 
@@ -53,8 +95,14 @@ def generate_spec_file():
     return spec_file
 
 
-def build_executable():
-    """Build the executable using PyInstaller."""
+def build_executable(clean=False, optimize=False):
+    """
+    Build the executable using PyInstaller.
+    
+    Args:
+        clean (bool): Clear PyInstaller's cache and temporary files before building
+        optimize (bool): Run PyInstaller with PYTHONOPTIMIZE=2 to strip asserts and docstrings
+    """
     if not check_prerequisites():
         return False
     
@@ -65,40 +113,78 @@ def build_executable():
     
     # Build with PyInstaller
     print("Building executable with PyInstaller...")
-    cmd = ['pyinstaller', '--clean', '--noconfirm', spec_file]
+    cmd = ['pyinstaller', '--noconfirm', spec_file]
+    env = os.environ.copy()
+    if optimize:
+        env['PYTHONOPTIMIZE'] = '2'
+        # Cached bytecode from a previous non-optimized build would otherwise be reused
+        clean = True
+    if clean:
+        cmd.insert(1, '--clean')
     
+    # The spec enables UPX compression, which only takes effect when UPX is installed
+    upx_path = which('upx')
+    if upx_path:
+        print(f"Compressing binaries with UPX: {upx_path}")
+        cmd[1:1] = ['--upx-dir', os.path.dirname(upx_path)]
+    else:
+        print("UPX not found; building without binary compression. Install UPX for a smaller executable.")
+    
+    # Stream PyInstaller's output as it runs instead of buffering the whole log,
+    # keeping only the tail for the failure report
+    last_lines = deque(maxlen=20)
     try:
-        result = subprocess.run(cmd, check=True, text=True, 
-                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print(result.stdout)
+        with subprocess.Popen(cmd, text=True, env=env, bufsize=1,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+            for line in process.stdout:
+                print(line, end='')
+                last_lines.append(line)
+            returncode = process.wait()
+        
+        if returncode != 0:
+            print(f"Build failed with error code {returncode}. Last output:")
+            print(''.join(last_lines), end='')
+            return False
         
         # Check if build was successful
-        if os.path.exists(os.path.join('dist', 'CountyDataSync' + ('.exe' if platform.system() == 'Windows' else ''))):
+        exe_path = get_executable_path()
+        if os.path.exists(exe_path):
+            if platform.system() != 'Windows':
+                # PyInstaller normally sets the execute bits; only chmod when they are missing
+                mode = os.stat(exe_path).st_mode
+                if mode | 0o111 != mode:
+                    os.chmod(exe_path, mode | 0o111)
             print("Build successful! Executable created in 'dist' directory.")
             return True
         else:
             print("Build failed: Executable not found in 'dist' directory.")
-            print(result.stderr)
             return False
-    except subprocess.CalledProcessError as e:
-        print(f"Build failed with error code {e.returncode}:")
-        print(e.stderr)
-        return False
     except Exception as e:
         print(f"Build failed with error: {str(e)}")
         return False
 
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Build the CountyDataSync executable')
+    parser.add_argument('--clean', action='store_true',
+                        help='Clear the PyInstaller cache before building (full rebuild)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Build with PYTHONOPTIMIZE=2 for smaller bytecode (implies --clean)')
+    return parser.parse_args()
+
+
 def main():
     """Run the PyInstaller build process."""
+    args = parse_arguments()
+    
     print("=" * 60)
     print("CountyDataSync PyInstaller Build Script")
     print("=" * 60)
     
-    if build_executable():
+    if build_executable(clean=args.clean, optimize=args.optimize):
         print("\nBuild completed successfully!")
-        exe_path = os.path.join('dist', 'CountyDataSync' + ('.exe' if platform.system() == 'Windows' else ''))
-        print(f"Executable path: {os.path.abspath(exe_path)}")
+        print(f"Executable path: {os.path.abspath(get_executable_path())}")
         
         # Suggest next steps
         print("\nNext steps:")
@@ -8,15 +8,37 @@ This script verifies that all required packages and tools are installed
 for packaging CountyDataSync as a standalone executable.
 
 Usage:
-    python check_packaging_readiness.py
+    python check_packaging_readiness.py [--no-cache]
+
+Passing results are cached in .cache/ for a day, keyed by the modification
+times of the required files and installed package directories; failing runs
+are never cached, so fixes show up on the next run. Use --no-cache to force a
+fresh check.
+Set DEEP_CHECK=1 to also run `az --version` when verifying the Azure CLI.
 """
 
 import sys
+import io
+import re
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import importlib
+import importlib.util
+from importlib import metadata
 import subprocess
 import platform
 import os
+import stat
 import shutil
+import functools
+from collections import defaultdict
+from types import MappingProxyType
+
+# Minimum supported Python version
+MIN_PYTHON_VERSION = (3, 7)
 
 # Required Python packages
 REQUIRED_PACKAGES = [
@@ -32,6 +54,32 @@ REQUIRED_PACKAGES = [
     'pyinstaller'
 ]
 
+# Import names for packages whose import name differs from the distribution
+# name; used only when a package's distribution metadata cannot be found
+IMPORT_NAMES = MappingProxyType({
+    'python-dotenv': 'dotenv',
+    'pyinstaller': 'PyInstaller',
+    'flask-sqlalchemy': 'flask_sqlalchemy',
+    'psycopg2-binary': 'psycopg2',
+    'pillow': 'PIL',
+    'azure-storage-blob': 'azure.storage.blob',
+    'azure-identity': 'azure.identity',
+    'azure-mgmt-resource': 'azure.mgmt.resource',
+    'azure-mgmt-web': 'azure.mgmt.web',
+    'azure-mgmt-monitor': 'azure.mgmt.monitor',
+    'azure-mgmt-applicationinsights': 'azure.mgmt.applicationinsights',
+})
+
+# PATH lookups are cached for the lifetime of the process
+which = functools.lru_cache(maxsize=None)(shutil.which)
+
+# Readiness result cache
+CACHE_DIR = '.cache'
+CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
+# Tool versions discovered during this run
+_tool_versions = {}
+
 # Required files for packaging
 REQUIRED_FILES = [
     'main.py',
@@ -39,129 +87,370 @@ REQUIRED_FILES = [
     'package_application.py'
 ]
 
+_NAME_SEPARATORS = re.compile(r'[-_.]+')
+
+def normalize_package_name(name):
+    """Normalize a distribution name (PEP 503) for comparison."""
+    return _NAME_SEPARATORS.sub('-', name).lower()
+
+def _package_lookup_names(package):
+    """Return a package's normalized distribution name and candidate import names."""
+    normalized = normalize_package_name(package)
+    return normalized, (IMPORT_NAMES.get(normalized, package), package.replace('-', '_'))
+
+# Lookup names for the required packages, computed once at import time
+PACKAGE_LOOKUP_NAMES = MappingProxyType({
+    package: _package_lookup_names(package) for package in REQUIRED_PACKAGES
+})
+
+def get_installed_distributions():
+    """Return the normalized names of all installed distributions."""
+    installed = set()
+    for dist in metadata.distributions():
+        name = dist.metadata['Name']
+        if name:
+            installed.add(normalize_package_name(name))
+    return installed
+
+def find_missing_packages(packages):
+    """
+    Find which of the given packages are not installed.
+    
+    Packages are looked up in the installed distribution metadata; packages
+    without discoverable metadata fall back to a find_spec probe. Neither
+    executes the package's code.
+    
+    Args:
+        packages (list): Distribution names to check
+        
+    Returns:
+        list: Packages that are not installed
+    """
+    installed = get_installed_distributions()
+    missing = []
+    for package in packages:
+        lookup_names = PACKAGE_LOOKUP_NAMES.get(package)
+        normalized, import_names = lookup_names or _package_lookup_names(package)
+        if normalized in installed:
+            continue
+        if not any(_module_exists(name) for name in import_names):
+            missing.append(package)
+    return missing
+
+def _module_exists(name):
+    """Check if a module can be imported without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # Raised when a parent package of a dotted name is missing
+        return False
+
+def probe_path(path):
+    """
+    Stat a path once so callers can test existence and type without extra syscalls.
+    
+    Returns:
+        os.stat_result: Result of os.stat, or None if the path does not exist
+    """
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+def is_executable_file(path):
+    """Check with a single stat that a path is a regular file with an execute bit set."""
+    st = probe_path(path)
+    return st is not None and stat.S_ISREG(st.st_mode) and bool(st.st_mode & 0o111)
+
+def scan_paths(paths):
+    """
+    Look up several paths with one directory scan per parent directory.
+    
+    Args:
+        paths (list): File or directory paths
+        
+    Returns:
+        dict: Maps each path to 'file', 'dir' or None if it does not exist
+    """
+    groups = defaultdict(list)
+    for path in paths:
+        groups[os.path.dirname(path) or '.'].append(path)
+    
+    found = {}
+    for directory, members in groups.items():
+        entries = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    entries[entry.name] = 'dir' if entry.is_dir() else 'file' if entry.is_file() else None
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+        for path in members:
+            found[path] = entries.get(os.path.basename(path))
+    return found
+
+def is_python_version_supported():
+    """Check if the running interpreter meets MIN_PYTHON_VERSION."""
+    return sys.version_info[:2] >= MIN_PYTHON_VERSION
+
+def get_pyinstaller_version():
+    """
+    Get the installed PyInstaller version, cached for the lifetime of the process.
+    
+    Returns:
+        str: PyInstaller version, or None if it is not installed
+    """
+    if 'pyinstaller' not in _tool_versions:
+        # Locate the package and read its version from metadata without
+        # executing PyInstaller's __init__ and the modules it pulls in
+        if importlib.util.find_spec('PyInstaller') is None:
+            _tool_versions['pyinstaller'] = None
+        else:
+            try:
+                _tool_versions['pyinstaller'] = metadata.version('pyinstaller')
+            except metadata.PackageNotFoundError:
+                _tool_versions['pyinstaller'] = 'unknown'
+    return _tool_versions['pyinstaller']
+
 def check_python_version():
     """Check if Python version is adequate."""
-    print("\nChecking Python version:")
-    python_version = sys.version_info
-    if python_version.major < 3 or (python_version.major == 3 and python_version.minor < 7):
-        print(f"❌ Python 3.7+ is required. Current version: {sys.version}")
-        return False
+    lines = ["\nChecking Python version:"]
+    if not is_python_version_supported():
+        lines.append(f"❌ Python 3.7+ is required. Current version: {sys.version}")
+        return False, lines
     else:
-        print(f"✓ Python version is adequate: {sys.version}")
-        return True
+        lines.append(f"✓ Python version is adequate: {sys.version}")
+        return True, lines
 
 def check_packages():
     """Check if all required packages are installed."""
-    print("\nChecking required packages:")
-    all_installed = True
-    missing_packages = []
+    lines = ["\nChecking required packages:"]
+    missing_packages = find_missing_packages(REQUIRED_PACKAGES)
+    all_installed = not missing_packages
     
     for package in REQUIRED_PACKAGES:
-        try:
-            importlib.import_module(package)
-            print(f"✓ {package} is installed")
-        except ImportError:
-            print(f"❌ {package} is missing")
-            missing_packages.append(package)
-            all_installed = False
+        if package in missing_packages:
+            lines.append(f"❌ {package} is missing")
+        else:
+            lines.append(f"✓ {package} is installed")
     
     if not all_installed:
-        print("\nInstall missing packages with:")
-        print(f"  pip install {' '.join(missing_packages)}")
+        lines.append("\nInstall missing packages with:")
+        lines.append(f"  pip install {' '.join(missing_packages)}")
     
-    return all_installed
+    return all_installed, lines
 
 def check_pyinstaller():
     """Check if PyInstaller is working properly."""
-    print("\nTesting PyInstaller:")
-    try:
-        result = subprocess.run(['pyinstaller', '--version'], 
-                               capture_output=True, text=True, check=True)
-        version = result.stdout.strip()
-        print(f"✓ PyInstaller version: {version}")
-        return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        print("❌ PyInstaller is not working properly")
-        return False
+    lines = ["\nTesting PyInstaller:"]
+    version = get_pyinstaller_version()
+    if version:
+        lines.append(f"✓ PyInstaller version: {version}")
+        return True, lines
+    else:
+        lines.append("❌ PyInstaller is not working properly")
+        return False, lines
 
 def check_files():
     """Check if required files for packaging exist."""
-    print("\nChecking required files:")
+    lines = ["\nChecking required files:"]
     all_exist = True
+    found = scan_paths(REQUIRED_FILES)
     
     for file in REQUIRED_FILES:
-        if os.path.exists(file):
-            print(f"✓ {file} exists")
+        if found[file] == 'file':
+            lines.append(f"✓ {file} exists")
         else:
-            print(f"❌ {file} is missing")
+            lines.append(f"❌ {file} is missing")
             all_exist = False
     
-    return all_exist
+    return all_exist, lines
 
 def check_installer_tools():
     """Check if installer creation tools are available."""
-    print("\nChecking installer tools:")
+    lines = ["\nChecking installer tools:"]
     sys_platform = platform.system()
     
     if sys_platform == 'Windows':
-        nsis_path = shutil.which('makensis')
+        nsis_path = which('makensis')
         if nsis_path:
-            print(f"✓ NSIS found: {nsis_path}")
-            return True
+            lines.append(f"✓ NSIS found: {nsis_path}")
+            return True, lines
         else:
-            print("ℹ️ NSIS not found. Install from https://nsis.sourceforge.io/ to create Windows installers")
-            return False
+            lines.append("ℹ️ NSIS not found. Install from https://nsis.sourceforge.io/ to create Windows installers")
+            return False, lines
     
     elif sys_platform == 'Darwin':  # macOS
-        create_dmg_path = shutil.which('create-dmg')
+        create_dmg_path = which('create-dmg')
         if create_dmg_path:
-            print(f"✓ create-dmg found: {create_dmg_path}")
-            return True
+            lines.append(f"✓ create-dmg found: {create_dmg_path}")
+            return True, lines
         else:
-            print("ℹ️ create-dmg not found. Install with 'brew install create-dmg' to create macOS installers")
-            return False
+            lines.append("ℹ️ create-dmg not found. Install with 'brew install create-dmg' to create macOS installers")
+            return False, lines
     
     else:  # Linux
-        print("ℹ️ No specific installer tool check for Linux")
-        return True
+        lines.append("ℹ️ No specific installer tool check for Linux")
+        return True, lines
 
 def check_azure_tools():
     """Check if Azure deployment tools are available."""
-    print("\nChecking Azure tools:")
+    lines = ["\nChecking Azure tools:"]
     
-    az_cli_path = shutil.which('az')
+    az_cli_path = which('az')
     if az_cli_path:
+        # Running `az --version` loads the whole Azure CLI, so only do it when
+        # a deep check is requested; otherwise an executable on PATH is enough
+        if not os.environ.get('DEEP_CHECK'):
+            if platform.system() == 'Windows' or is_executable_file(az_cli_path):
+                lines.append(f"✓ Azure CLI is installed: {az_cli_path}")
+                return True, lines
+            lines.append("❌ Azure CLI is installed but not executable")
+            return False, lines
         try:
             # Get Azure CLI version
-            result = subprocess.run(['az', '--version'], 
+            result = subprocess.run([az_cli_path, '--version'], 
                                    capture_output=True, text=True, check=True)
-            print(f"✓ Azure CLI is installed")
-            return True
+            lines.append(f"✓ Azure CLI is installed")
+            return True, lines
         except (subprocess.SubprocessError, FileNotFoundError):
-            print("❌ Azure CLI is installed but not working properly")
-            return False
+            lines.append("❌ Azure CLI is installed but not working properly")
+            return False, lines
     else:
-        print("ℹ️ Azure CLI not found. Install it to deploy to Azure")
-        return False
+        lines.append("ℹ️ Azure CLI not found. Install it to deploy to Azure")
+        return False, lines
+
+def run_checks(checks):
+    """
+    Run independent checks concurrently, printing their output in order.
+    
+    Each check returns its result together with the lines it reports, so
+    nothing is printed from the worker threads.
+    
+    Args:
+        checks (list): (name, function) pairs; each function returns (result, lines)
+        
+    Returns:
+        list: (name, result) pairs in the original order
+    """
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [(name, executor.submit(check)) for name, check in checks]
+        results = []
+        for name, future in futures:
+            result, lines = future.result()
+            print("\n".join(lines))
+            results.append((name, result))
+    return results
+
+class _TeeStdout:
+    """Stdout proxy that also records everything written to it."""
+    
+    def __init__(self, stream, record):
+        self._stream = stream
+        self._record = record
+    
+    def write(self, text):
+        self._record.write(text)
+        return self._stream.write(text)
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def get_cache_key():
+    """
+    Build a cache key from everything the checks depend on.
+    
+    Installing or removing a package updates the mtime of its site-packages
+    directory, and installing a tool updates its PATH directory.
+    """
+    watched = list(REQUIRED_FILES)
+    # sys.path[0] is the project directory, whose mtime changes when the cache is written
+    watched.extend(p for p in sys.path[1:] if p)
+    watched.extend(p for p in os.environ.get('PATH', '').split(os.pathsep) if p)
+    stamps = []
+    for path in sorted(set(watched)):
+        st = probe_path(path)
+        if st is not None:
+            stamps.append((path, st.st_mtime_ns))
+    key_source = repr((sys.version, platform.system(), os.environ.get('DEEP_CHECK'), stamps))
+    return hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+
+def load_cached_result(cache_file):
+    """Return a cached passing (exit code, report) if it exists and is fresh enough."""
+    st = probe_path(cache_file)
+    if st is None or time.time() - st.st_mtime > CACHE_MAX_AGE:
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['exit_code'] != 0:
+            return None
+        return cached['exit_code'], cached['report']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_cached_result(cache_file, exit_code, report):
+    """Atomically write a readiness result to the cache."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_file = f"{cache_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'exit_code': exit_code, 'report': report}, f)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write readiness cache: {e}")
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Check CountyDataSync packaging readiness')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore cached results and run every check')
+    return parser.parse_args()
 
 def main():
     """Main function to check packaging readiness."""
+    args = parse_arguments()
+    
+    cache_file = os.path.join(CACHE_DIR, f"readiness-{get_cache_key()}.json")
+    if not args.no_cache:
+        cached = load_cached_result(cache_file)
+        if cached:
+            exit_code, report = cached
+            sys.stdout.write(report)
+            print("\n(cached result; use --no-cache to re-run the checks)")
+            return exit_code
+    
+    # Record the report while printing it so it can be replayed from the cache
+    stdout = sys.stdout
+    report = io.StringIO()
+    sys.stdout = _TeeStdout(stdout, report)
+    try:
+        exit_code = run_readiness_checks()
+    finally:
+        sys.stdout = stdout
+    
+    # Only passing runs are cached; a failure must be re-checked once it is fixed
+    if exit_code == 0:
+        save_cached_result(cache_file, exit_code, report.getvalue())
+    return exit_code
+
+def run_readiness_checks():
+    """Run all checks, print the summary and return the exit code."""
     print("=" * 60)
     print("CountyDataSync Packaging Readiness Check")
     print("=" * 60)
     
-    checks = [
-        ("Python version", check_python_version()),
-        ("Required packages", check_packages()),
-        ("PyInstaller", check_pyinstaller()),
-        ("Required files", check_files()),
-        ("Installer tools", check_installer_tools()),
-        ("Azure tools", check_azure_tools())
-    ]
+    checks = run_checks([
+        ("Python version", check_python_version),
+        ("Required packages", check_packages),
+        ("PyInstaller", check_pyinstaller),
+        ("Required files", check_files),
+        ("Installer tools", check_installer_tools),
+        ("Azure tools", check_azure_tools)
+    ])
     
     # Summary
-    print("\n" + "=" * 60)
-    print("Summary:")
+    summary = ["\n" + "=" * 60, "Summary:"]
     all_required_ok = True
     
     for name, result in checks:
@@ -172,7 +461,8 @@ def main():
         else:
             status = "✓" if result else "ℹ️"
             
-        print(f"{status} {name}")
+        summary.append(f"{status} {name}")
+    print("\n".join(summary))
     
     print("\nVerdict:", end=" ")
     if all_required_ok:
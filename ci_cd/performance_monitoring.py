@@ -3,16 +3,162 @@ Performance monitoring script for CI/CD pipelines.
 Analyzes ETL job performance and reports trends over time.
 """
 import os
+import functools
 import json
 import sqlite3
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder and parser
+    orjson = None
 from datetime import datetime, timedelta
 
 # Ensure output directories exist
 os.makedirs('ci_cd/reports', exist_ok=True)
 os.makedirs('ci_cd/artifacts', exist_ok=True)
 
+# Rows fetched per round trip when streaming query results
+READ_CHUNKSIZE = 10_000
+
+# SQLAlchemy engines (and their connection pools) keyed by database URL
+_engines = {}
+
+def get_engine(db_url):
+    """
+    Get a pooled SQLAlchemy engine for a database URL, creating it on first use.
+    
+    Args:
+        db_url (str): Database connection URL
+        
+    Returns:
+        sqlalchemy.engine.Engine: Engine configured to stream query results
+    """
+    engine = _engines.get(db_url)
+    if engine is None:
+        from sqlalchemy import create_engine
+        
+        engine = create_engine(db_url).execution_options(stream_results=True)
+        _engines[db_url] = engine
+    return engine
+
+def read_sql_chunked(sql, con, params=None, chunksize=READ_CHUNKSIZE):
+    """
+    Read a query result in chunks and concatenate them once at the end.
+    
+    Args:
+        sql: SQL query to run
+        con: SQLAlchemy engine or DB-API connection
+        params (dict, optional): Bind parameters for the query
+        chunksize (int): Number of rows fetched per chunk
+        
+    Returns:
+        pd.DataFrame: Query result
+    """
+    chunks = list(pd.read_sql(sql, con, params=params, chunksize=chunksize))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+def write_json(path, data):
+    """
+    Write data to a JSON file with two-space indentation, using orjson when available.
+    
+    Args:
+        path (str): Output file path
+        data: JSON-serializable data
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+def empty_performance_data():
+    """
+    Build the performance data structure for when no data is available.
+    
+    Returns:
+        dict: Empty jobs, status_counts and metrics DataFrames
+    """
+    return {
+        'jobs': pd.DataFrame(),
+        'status_counts': pd.DataFrame(columns=['status', 'job_count']),
+        'metrics': pd.DataFrame()
+    }
+
+# Performance queries, kept as constant text with bound limits so the drivers'
+# statement caches can reuse the parsed statement across calls
+JOBS_SQL = """
+SELECT id, job_name, start_time, end_time, status,
+       record_count, extraction_time, transformation_time,
+       loading_time, peak_memory_usage
+FROM etl_job
+WHERE end_time IS NOT NULL AND status = 'completed'
+ORDER BY start_time DESC
+LIMIT :job_limit
+"""
+
+# Count job outcomes in the database rather than filtering rows client-side
+STATUS_COUNTS_SQL = """
+SELECT status, COUNT(*) AS job_count
+FROM (
+    SELECT status FROM etl_job
+    WHERE end_time IS NOT NULL
+    ORDER BY start_time DESC
+    LIMIT :job_limit
+) recent_jobs
+GROUP BY status
+"""
+
+METRICS_SQL = """
+SELECT pm.job_id, pm.stage, pm.memory_usage, pm.cpu_usage,
+       pm.elapsed_time, pm.records_processed, pm.timestamp
+FROM performance_metric pm
+JOIN etl_job j ON j.id = pm.job_id
+WHERE j.end_time IS NOT NULL
+ORDER BY pm.timestamp DESC
+LIMIT :metric_limit
+"""
+
+QUERY_PARAMS = {'job_limit': 100, 'metric_limit': 1000}
+
+@functools.lru_cache(maxsize=None)
+def sqlalchemy_statement(sql):
+    """
+    Wrap SQL text in a SQLAlchemy text() construct, built once per statement.
+    
+    Args:
+        sql (str): SQL text using :name bind parameters
+        
+    Returns:
+        sqlalchemy.sql.elements.TextClause: Executable statement
+    """
+    from sqlalchemy import text
+    
+    return text(sql)
+
+def query_performance_data(con, statement=None):
+    """
+    Run the performance queries against a database connection.
+    
+    Args:
+        con: SQLAlchemy engine or DB-API connection
+        statement (callable, optional): Converts SQL text to the form the connection executes
+        
+    Returns:
+        dict: Completed jobs, job counts by status and performance metrics
+    """
+    if statement is None:
+        statement = lambda sql: sql
+    return {
+        'jobs': read_sql_chunked(statement(JOBS_SQL), con, params=QUERY_PARAMS),
+        'status_counts': read_sql_chunked(statement(STATUS_COUNTS_SQL), con, params=QUERY_PARAMS),
+        'metrics': read_sql_chunked(statement(METRICS_SQL), con, params=QUERY_PARAMS)
+    }
+
 def extract_performance_data_from_db(db_url=None):
     """
     Extract performance data from the application database.
@@ -22,112 +168,78 @@ def extract_performance_data_from_db(db_url=None):
         db_url (str, optional): Database connection URL
         
     Returns:
-        pd.DataFrame: Performance metrics from the database
+        dict: Completed jobs, job counts by status and performance metrics
     """
     # Use SQLite for local development/testing if no DATABASE_URL
     if not db_url:
         # Check if a local testing database exists, if not, return empty dataframe
         if not os.path.exists('instance/test.db'):
-            return pd.DataFrame()
+            return empty_performance_data()
         
         conn = sqlite3.connect('instance/test.db')
         # Query ETL job data
         try:
-            # Try to get performance data from database
-            df_jobs = pd.read_sql(
-                """
-                SELECT id, job_name, start_time, end_time, status, 
-                       record_count, extraction_time, transformation_time,
-                       loading_time, peak_memory_usage
-                FROM etl_job
-                WHERE end_time IS NOT NULL
-                ORDER BY start_time DESC
-                LIMIT 100
-                """, 
-                conn
-            )
-            
-            # Get performance metrics for each job
-            df_metrics = pd.read_sql(
-                """
-                SELECT job_id, stage, memory_usage, cpu_usage, elapsed_time,
-                       records_processed, timestamp
-                FROM performance_metric
-                WHERE job_id IN (SELECT id FROM etl_job WHERE end_time IS NOT NULL)
-                ORDER BY timestamp DESC
-                LIMIT 1000
-                """,
-                conn
-            )
-            
-            return {
-                'jobs': df_jobs,
-                'metrics': df_metrics
-            }
-        except:
+            return query_performance_data(conn)
+        except (sqlite3.Error, pd.errors.DatabaseError) as e:
             # Tables might not exist yet
-            return {
-                'jobs': pd.DataFrame(),
-                'metrics': pd.DataFrame()
-            }
+            print(f"Error reading performance data: {str(e)}")
+            return empty_performance_data()
+        finally:
+            conn.close()
     else:
         # Use PostgreSQL connection if available
         try:
             import psycopg2
-            from sqlalchemy import create_engine
-            
-            engine = create_engine(db_url)
-            
-            # Query ETL job data
-            df_jobs = pd.read_sql(
-                """
-                SELECT id, job_name, start_time, end_time, status, 
-                       record_count, extraction_time, transformation_time,
-                       loading_time, peak_memory_usage
-                FROM etl_job
-                WHERE end_time IS NOT NULL
-                ORDER BY start_time DESC
-                LIMIT 100
-                """, 
-                engine
-            )
             
-            # Get performance metrics for each job
-            df_metrics = pd.read_sql(
-                """
-                SELECT job_id, stage, memory_usage, cpu_usage, elapsed_time,
-                       records_processed, timestamp
-                FROM performance_metric
-                WHERE job_id IN (SELECT id FROM etl_job WHERE end_time IS NOT NULL)
-                ORDER BY timestamp DESC
-                LIMIT 1000
-                """,
-                engine
-            )
-            
-            return {
-                'jobs': df_jobs,
-                'metrics': df_metrics
-            }
+            return query_performance_data(get_engine(db_url), statement=sqlalchemy_statement)
         except Exception as e:
             print(f"Error connecting to database: {str(e)}")
-            return {
-                'jobs': pd.DataFrame(),
-                'metrics': pd.DataFrame()
-            }
+            return empty_performance_data()
+
+def duration_seconds(start_times, end_times):
+    """
+    Compute durations in seconds by subtracting nanosecond timestamps directly.
+    
+    Avoids building an intermediate Timedelta Series just to call total_seconds().
+    
+    Args:
+        start_times (pd.Series): Start timestamps (datetimes or parseable strings)
+        end_times (pd.Series): End timestamps (datetimes or parseable strings)
+        
+    Returns:
+        np.ndarray: Durations in seconds, NaN where either timestamp is missing
+    """
+    start = pd.to_datetime(start_times).to_numpy(dtype='datetime64[ns]')
+    end = pd.to_datetime(end_times).to_numpy(dtype='datetime64[ns]')
+    durations = (end.view('i8') - start.view('i8')) / 1e9
+    durations[np.isnat(start) | np.isnat(end)] = np.nan
+    return durations
 
 def generate_performance_report(data, output_dir='ci_cd/reports'):
     """
     Generate a performance report for CI/CD pipelines.
     
+    extract_performance_data_from_db returns only completed jobs in data['jobs']
+    and the outcome counts of all recent finished jobs in data['status_counts'].
+    Callers may instead pass just {'jobs', 'metrics'} with jobs of any status;
+    the counts are then taken from data['jobs'] and non-completed jobs are left
+    out of the averages and trends.
+    
     Args:
-        data (dict): Dictionary with jobs and metrics DataFrames
+        data (dict): Dictionary with jobs, metrics and (optionally) status_counts DataFrames
         output_dir (str): Directory to save reports
         
     Returns:
         dict: Report summary data
     """
-    if data['jobs'].empty:
+    jobs = data['jobs']
+    if 'status_counts' in data:
+        status_counts = dict(zip(data['status_counts']['status'], data['status_counts']['job_count']))
+    elif not jobs.empty:
+        status_counts = jobs['status'].value_counts().to_dict()
+    else:
+        status_counts = {}
+    if not status_counts:
         print("No job data available for reporting")
         return {
             'status': 'no_data',
@@ -136,9 +248,9 @@ def generate_performance_report(data, output_dir='ci_cd/reports'):
     
     # Calculate key metrics
     summary = {
-        'total_jobs': len(data['jobs']),
-        'successful_jobs': len(data['jobs'][data['jobs']['status'] == 'completed']),
-        'failed_jobs': len(data['jobs'][data['jobs']['status'] == 'failed']),
+        'total_jobs': int(sum(status_counts.values())),
+        'successful_jobs': int(status_counts.get('completed', 0)),
+        'failed_jobs': int(status_counts.get('failed', 0)),
         'avg_duration': None,
         'avg_memory_usage': None,
         'avg_extraction_time': None,
@@ -149,8 +261,10 @@ def generate_performance_report(data, output_dir='ci_cd/reports'):
         'timestamp': datetime.now().isoformat()
     }
     
-    # Calculate average durations for completed jobs
-    completed_jobs = data['jobs'][data['jobs']['status'] == 'completed']
+    # Calculate average durations for completed jobs (the query only returns completed jobs)
+    completed_jobs = jobs
+    if not jobs.empty and not (jobs['status'] == 'completed').all():
+        completed_jobs = jobs[jobs['status'] == 'completed'].copy()
     if not completed_jobs.empty:
         # Convert time columns to datetime if they're strings
         if completed_jobs['start_time'].dtype == 'object':
@@ -159,8 +273,8 @@ def generate_performance_report(data, output_dir='ci_cd/reports'):
             completed_jobs['end_time'] = pd.to_datetime(completed_jobs['end_time'])
         
         # Calculate duration in seconds
-        completed_jobs['duration'] = (completed_jobs['end_time'] - 
-                                     completed_jobs['start_time']).dt.total_seconds()
+        completed_jobs['duration'] = duration_seconds(completed_jobs['start_time'],
+                                                      completed_jobs['end_time'])
         
         summary['avg_duration'] = completed_jobs['duration'].mean()
         summary['avg_memory_usage'] = completed_jobs['peak_memory_usage'].mean()
@@ -168,23 +282,28 @@ def generate_performance_report(data, output_dir='ci_cd/reports'):
         summary['avg_transformation_time'] = completed_jobs['transformation_time'].mean()
         summary['avg_loading_time'] = completed_jobs['loading_time'].mean()
         
-        # Create time series data for trends (last 10 jobs)
+        # Create time series data for trends (last 10 jobs), converting whole columns at once
         last_jobs = completed_jobs.sort_values('start_time').tail(10)
-        for _, job in last_jobs.iterrows():
-            summary['record_count_trend'].append({
-                'job_id': int(job['id']),
-                'timestamp': job['start_time'].isoformat(),
-                'record_count': int(job['record_count']) if pd.notna(job['record_count']) else 0,
-                'duration': float(job['duration']) if pd.notna(job['duration']) else 0
-            })
-            
-            summary['performance_trend'].append({
-                'job_id': int(job['id']),
-                'extraction_time': float(job['extraction_time']) if pd.notna(job['extraction_time']) else 0,
-                'transformation_time': float(job['transformation_time']) if pd.notna(job['transformation_time']) else 0,
-                'loading_time': float(job['loading_time']) if pd.notna(job['loading_time']) else 0,
-                'memory_usage': float(job['peak_memory_usage']) if pd.notna(job['peak_memory_usage']) else 0
-            })
+        trend = last_jobs[[
+            'id', 'record_count', 'duration', 'extraction_time',
+            'transformation_time', 'loading_time', 'peak_memory_usage'
+        ]].fillna(0).astype({
+            'id': int,
+            'record_count': int,
+            'duration': float,
+            'extraction_time': float,
+            'transformation_time': float,
+            'loading_time': float,
+            'peak_memory_usage': float
+        }).rename(columns={'id': 'job_id', 'peak_memory_usage': 'memory_usage'})
+        trend['timestamp'] = last_jobs['start_time'].map(pd.Timestamp.isoformat)
+        
+        summary['record_count_trend'] = trend[
+            ['job_id', 'timestamp', 'record_count', 'duration']
+        ].to_dict(orient='records')
+        summary['performance_trend'] = trend[
+            ['job_id', 'extraction_time', 'transformation_time', 'loading_time', 'memory_usage']
+        ].to_dict(orient='records')
     
     # Generate visualizations
     if not completed_jobs.empty and len(completed_jobs) > 1:
@@ -201,11 +320,26 @@ def generate_performance_report(data, output_dir='ci_cd/reports'):
     
     # Save summary report
     summary_file = os.path.join(output_dir, 'performance_summary.json')
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    write_json(summary_file, summary)
     
     return summary
 
+@functools.lru_cache(maxsize=None)
+def get_pyplot():
+    """
+    Import matplotlib's pyplot on first use, so runs without plots never pay for it.
+    
+    Returns:
+        module: matplotlib.pyplot configured with the non-interactive Agg backend
+    """
+    import matplotlib
+    
+    # Render straight to files; skips probing for an interactive GUI backend
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    return plt
+
 def plot_job_phase_times(df, output_dir):
     """
     Plot ETL phase times for completed jobs.
@@ -214,27 +348,29 @@ def plot_job_phase_times(df, output_dir):
         df (pd.DataFrame): DataFrame with job data
         output_dir (str): Directory to save plots
     """
-    plt.figure(figsize=(10, 6))
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(10, 6))
     
     # Get last 10 jobs for better visualization
     df = df.sort_values('start_time').tail(10)
     
-    # Create DataFrame for plotting
-    plot_data = pd.DataFrame({
-        'Job ID': df['id'],
-        'Extraction': df['extraction_time'],
-        'Transformation': df['transformation_time'],
-        'Loading': df['loading_time']
-    }).set_index('Job ID')
-    
-    # Plot stacked bar chart
-    plot_data.plot(kind='bar', stacked=True, ax=plt.gca())
-    plt.title('ETL Phase Times by Job')
-    plt.ylabel('Time (seconds)')
-    plt.xlabel('Job ID')
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'etl_phase_times.png'))
-    plt.close()
+    # Plot stacked bar chart directly from the phase columns (missing times stack as 0)
+    x = np.arange(len(df))
+    extraction = df['extraction_time'].to_numpy(dtype=float, na_value=0.0)
+    transformation = df['transformation_time'].to_numpy(dtype=float, na_value=0.0)
+    loading = df['loading_time'].to_numpy(dtype=float, na_value=0.0)
+    ax.bar(x, extraction, label='Extraction')
+    ax.bar(x, transformation, bottom=extraction, label='Transformation')
+    ax.bar(x, loading, bottom=extraction + transformation, label='Loading')
+    ax.set_xticks(x)
+    ax.set_xticklabels(df['id'].tolist(), rotation=90)
+    ax.legend()
+    ax.set_title('ETL Phase Times by Job')
+    ax.set_ylabel('Time (seconds)')
+    ax.set_xlabel('Job ID')
+    fig.tight_layout()
+    fig.savefig(os.path.join(output_dir, 'etl_phase_times.png'))
+    plt.close(fig)
 
 def plot_memory_usage_trend(df, output_dir):
     """
@@ -244,20 +380,21 @@ def plot_memory_usage_trend(df, output_dir):
         df (pd.DataFrame): DataFrame with job data
         output_dir (str): Directory to save plots
     """
-    plt.figure(figsize=(10, 6))
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(10, 6))
     
     # Sort by start time
     df = df.sort_values('start_time')
     
     # Create plot
-    plt.plot(df['start_time'], df['peak_memory_usage'], marker='o')
-    plt.title('Peak Memory Usage Trend')
-    plt.ylabel('Memory Usage (MB)')
-    plt.xlabel('Job Start Time')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'memory_usage_trend.png'))
-    plt.close()
+    ax.plot(df['start_time'], df['peak_memory_usage'], marker='o')
+    ax.set_title('Peak Memory Usage Trend')
+    ax.set_ylabel('Memory Usage (MB)')
+    ax.set_xlabel('Job Start Time')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(os.path.join(output_dir, 'memory_usage_trend.png'))
+    plt.close(fig)
 
 def plot_record_throughput(df, output_dir):
     """
@@ -267,27 +404,45 @@ def plot_record_throughput(df, output_dir):
         df (pd.DataFrame): DataFrame with job data
         output_dir (str): Directory to save plots
     """
-    plt.figure(figsize=(10, 6))
-    
-    # Calculate throughput (records per second)
-    df = df.copy()
-    if 'duration' not in df.columns:
-        df['duration'] = (df['end_time'] - df['start_time']).dt.total_seconds()
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(10, 6))
     
-    df['throughput'] = df['record_count'] / df['duration']
+    # Calculate throughput (records per second) on the two columns needed rather
+    # than copying the whole DataFrame; jobs without a positive duration are left out
+    records = df['record_count'].to_numpy(dtype=float, na_value=np.nan)
+    if 'duration' in df.columns:
+        duration = df['duration'].to_numpy(dtype=float, na_value=np.nan)
+    else:
+        duration = duration_seconds(df['start_time'], df['end_time'])
+    throughput = np.divide(records, duration, out=np.full_like(records, np.nan), where=duration > 0)
     
     # Sort by start time
-    df = df.sort_values('start_time')
+    start_times = df['start_time'].to_numpy()
+    order = np.argsort(start_times, kind='stable')
     
     # Create plot
-    plt.plot(df['start_time'], df['throughput'], marker='o')
-    plt.title('Record Throughput Trend')
-    plt.ylabel('Records per Second')
-    plt.xlabel('Job Start Time')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'record_throughput.png'))
-    plt.close()
+    ax.plot(start_times[order], throughput[order], marker='o')
+    ax.set_title('Record Throughput Trend')
+    ax.set_ylabel('Records per Second')
+    ax.set_xlabel('Job Start Time')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(os.path.join(output_dir, 'record_throughput.png'))
+    plt.close(fig)
+
+def load_previous_summary(summary_file):
+    """
+    Load a previous performance summary.
+    
+    Args:
+        summary_file (str): Path to the summary JSON file
+        
+    Returns:
+        dict: Previous performance summary
+    """
+    with open(summary_file, 'rb') as f:
+        content = f.read()
+    return orjson.loads(content) if orjson is not None else json.loads(content)
 
 def check_performance_regression(current_data, threshold=0.2):
     """
@@ -309,8 +464,7 @@ def check_performance_regression(current_data, threshold=0.2):
         }
     
     try:
-        with open(summary_file, 'r') as f:
-            previous_data = json.load(f)
+        previous_data = load_previous_summary(summary_file)
         
         # Check for regressions
         regressions = []
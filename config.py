@@ -29,6 +29,10 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Batch settings
 DEFAULT_BATCH_SIZE = int(os.getenv('DEFAULT_BATCH_SIZE', '1000'))
+# Rows fetched per round trip when extracting from SQL Server
+EXTRACT_ARRAYSIZE = int(os.getenv('EXTRACT_ARRAYSIZE', '10000'))
+# Id-range partitions fetched in parallel when extracting (1 = single query)
+EXTRACT_PARTITIONS = int(os.getenv('EXTRACT_PARTITIONS', '1'))
 
 # Logging configuration
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
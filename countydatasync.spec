@@ -34,7 +34,17 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=[
+        'tkinter',
+        'pytest',
+        'hypothesis',
+        'IPython',
+        'notebook',
+        'matplotlib.tests',
+        'numpy.tests',
+        'pandas.tests',
+        'scipy',
+    ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -55,7 +65,7 @@ exe = EXE(
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
+    upx_exclude=['vcruntime140.dll', 'python3*.dll'],  # UPX-compressed copies of these break on Windows
     runtime_tmpdir=None,
     console=True,
     disable_windowed_traceback=False,
@@ -3,10 +3,24 @@ Data quality analysis and visualization module for CountyDataSync ETL process.
 Provides functionality for generating data quality metrics and heatmaps.
 """
 import os
+import functools
 import logging
 import pandas as pd
 import numpy as np
 import json
+from collections import Counter
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder
+    orjson = None
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    # Fall back to pandas' CSV writer
+    pa = None
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from etl.utils import ensure_directory_exists, get_timestamp
 
@@ -18,91 +32,441 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=None)
+def get_column_kind(dtype):
+    """
+    Classify a column dtype for type-specific quality analysis.
+    
+    Args:
+        dtype: Column dtype
+        
+    Returns:
+        str: 'string', 'numeric', 'datetime' or 'other'
+    """
+    if dtype == 'object':
+        return 'string'
+    if pa is not None and isinstance(dtype, pd.ArrowDtype):
+        # Arrow-backed columns, e.g. from read_csv(dtype_backend='pyarrow')
+        arrow_type = dtype.pyarrow_dtype
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+            return 'string'
+        if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+            return 'numeric'
+        if pa.types.is_timestamp(arrow_type):
+            return 'datetime'
+        return 'other'
+    try:
+        if np.issubdtype(dtype, np.number):
+            return 'numeric'
+    except TypeError:
+        # Extension dtypes such as categoricals are not NumPy types
+        return 'other'
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return 'datetime'
+    return 'other'
+
+def _analyze_string_column(col, n):
+    """String-based analysis of an object column."""
+    # One hash pass yields the distinct values and their counts; every other
+    # string metric is derived from those instead of re-scanning the column
+    counts = col.value_counts(dropna=False)
+    non_null_counts = counts[counts.index.notna()]
+    lengths = counts.index.astype(str).str.len()
+    unique_values = len(non_null_counts)
+    empty_strings = int(non_null_counts.get('', 0))
+    return {
+        'unique_values': unique_values,
+        'unique_percentage': (unique_values / n) * 100,
+        'max_length': lengths.max(),
+        'min_length': lengths.min(),
+        'empty_strings': empty_strings,
+        'empty_strings_percentage': (empty_strings / n) * 100,
+        # Most common values
+        'most_common_values': non_null_counts.head(5).to_dict()
+    }
+
+def _analyze_numeric_column(col, n):
+    """Numeric analysis, including 3-sigma outlier detection."""
+    values = col.to_numpy(dtype=float, na_value=np.nan)
+    zeros = int(np.count_nonzero(values == 0))
+    negative_values = int(np.count_nonzero(values < 0))
+    metrics = {
+        'min': col.min(),
+        'max': col.max(),
+        'mean': col.mean(),
+        'median': col.median(),
+        'std': col.std(),
+        'zeros': zeros,
+        'zeros_percentage': (zeros / n) * 100,
+        'negative_values': negative_values,
+        'negative_percentage': (negative_values / n) * 100,
+    }
+    
+    # Outlier detection (values outside 3 standard deviations)
+    if not pd.isna(metrics['std']) and metrics['std'] != 0:
+        outliers_count = int(np.count_nonzero(np.abs(values - metrics['mean']) > 3 * metrics['std']))
+        metrics['outliers_count'] = outliers_count
+        metrics['outliers_percentage'] = (outliers_count / n) * 100
+    else:
+        metrics['outliers_count'] = 0
+        metrics['outliers_percentage'] = 0
+    return metrics
+
+def _analyze_datetime_column(col, n):
+    """Date/time analysis."""
+    min_date = col.min()
+    max_date = col.max()
+    future_dates = int((col > pd.Timestamp.now()).sum())
+    return {
+        'min_date': min_date.isoformat(),
+        'max_date': max_date.isoformat(),
+        'range_days': (max_date - min_date).days,
+        'future_dates': future_dates,
+        'future_dates_percentage': (future_dates / n) * 100
+    }
+
+def has_strided_columns(df):
+    """
+    Check whether any column of the DataFrame is a non-contiguous view into its storage.
+    
+    This happens when a DataFrame wraps a row-major 2D array, e.g. pd.DataFrame(ndarray).
+    
+    Args:
+        df (pd.DataFrame): DataFrame to check
+        
+    Returns:
+        bool: True if reading a column strides across memory
+    """
+    if len(df) < 2 or len(df.columns) < 2:
+        return False
+    # Extension (e.g. Arrow-backed) columns keep their own storage; converting
+    # them to NumPy just to check would copy them
+    return any(
+        not df.iloc[:, i].to_numpy().flags.c_contiguous
+        for i, dtype in enumerate(df.dtypes)
+        if isinstance(dtype, np.dtype)
+    )
+
+def compute_heatmap_scores(null_pct, empty_pct, negative_pct, unique_pct, outliers_pct, record_count):
+    """
+    Compute heatmap quality scores for all columns at once.
+    
+    Each argument is a float array with one entry per column. The scores are
+    written into a single preallocated array so no per-score temporaries are kept.
+    
+    Args:
+        null_pct (np.ndarray): Null percentage per column
+        empty_pct (np.ndarray): Empty string percentage per column
+        negative_pct (np.ndarray): Negative value percentage per column
+        unique_pct (np.ndarray): Unique value percentage per column
+        outliers_pct (np.ndarray): Outlier percentage per column
+        record_count (int): Number of records in the DataFrame
+        
+    Returns:
+        np.ndarray: Array of shape (columns, 5) with completeness, validity,
+            consistency, outliers and overall scores, each between 0 and 100
+    """
+    scores = np.empty((len(null_pct), 5))
+    completeness, validity, consistency, outliers, overall_score = scores.T
+    
+    # Completeness: 100 - null_percentage
+    np.subtract(100, null_pct, out=completeness)
+    
+    # Validity: penalize empty strings and (domain-specific) negative values
+    np.subtract(100, empty_pct, out=validity)
+    np.subtract(validity, negative_pct, out=validity, where=negative_pct > 0)
+    
+    # Consistency: for categorical columns, high uniqueness might indicate inconsistency
+    consistency.fill(100)
+    if record_count > 100:
+        np.subtract(100, (unique_pct - 95) * 20, out=consistency, where=unique_pct > 95)
+    
+    # Outliers score: 100 - outliers_percentage
+    np.subtract(100, outliers_pct, out=outliers)
+    
+    # Overall score: average of the other scores before they are clamped
+    np.mean(scores[:, :4], axis=1, out=overall_score)
+    
+    # Ensure scores are between 0 and 100
+    return np.clip(scores, 0, 100, out=scores)
+
+def _json_default(obj):
+    """Convert NumPy scalars, which the JSON encoders do not handle natively, to Python values."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def write_json(path, data):
+    """
+    Write data to a JSON file with two-space indentation, using orjson when available.
+    
+    Args:
+        path (str): Output file path
+        data: JSON-serializable data, which may include NumPy scalars
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                data,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+
+class _ColumnAccumulator:
+    """
+    Running quality metrics for one column, updated chunk by chunk.
+    
+    The metrics match analyze_column_quality on the concatenated chunks. Counts,
+    extremes, mean and standard deviation are merged per chunk; string metrics
+    come from a Counter merged across chunks. The non-null values of numeric
+    columns are kept as float64 arrays so the median and 3-sigma outlier count
+    are exact, so memory for a numeric column grows with its non-null values
+    (8 bytes each) rather than staying bounded by the chunk size.
+    
+    SQLite columns are dynamically typed, so chunks of one column can come
+    back with different kinds (e.g. integers, then text). When that happens
+    the column is analyzed as strings, like the object column a whole-table
+    read produces, and the numeric values seen so far are folded into the
+    Counter.
+    """
+    def __init__(self):
+        self.kind = None
+        self.first_kind = None
+        self.count = 0
+        self.null_count = 0
+        # numeric
+        self.valid = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.zeros = 0
+        self.negatives = 0
+        self.values = []
+        self.integer_values = True
+        # string; lengths of the text form of null values, which
+        # analyze_column_quality includes in min_length/max_length
+        self.value_counts = Counter()
+        self.null_lengths = set()
+        # datetime
+        self.future_dates = 0
+    
+    def update(self, col, null_col):
+        """Fold one chunk of the column into the running metrics."""
+        self.count += len(col)
+        nulls = int(null_col.to_numpy().sum())
+        self.null_count += nulls
+        chunk_kind = get_column_kind(col.dtype)
+        if self.first_kind is None:
+            self.first_kind = chunk_kind
+        if nulls:
+            if chunk_kind == 'string':
+                nulls_text = col[null_col.to_numpy()].value_counts(dropna=False).index.astype(str)
+                self.null_lengths.update(nulls_text.str.len().tolist())
+            else:
+                # SQL NULLs in a typed chunk are None once the column is text
+                self.null_lengths.add(len(str(None)))
+        if nulls == len(col):
+            # An all-null chunk says nothing about the column type
+            return
+        if self.kind is None:
+            self.kind = chunk_kind
+        elif chunk_kind != self.kind and self.kind != 'string':
+            self._demote_to_string()
+        
+        if self.kind == 'numeric':
+            self._update_numeric(col)
+        elif self.kind == 'string':
+            self.value_counts.update(col.value_counts(dropna=True).to_dict())
+        elif self.kind == 'datetime':
+            chunk_min, chunk_max = col.min(), col.max()
+            self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+            self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+            self.future_dates += int((col > pd.Timestamp.now()).sum())
+    
+    def _demote_to_string(self):
+        """Switch to string metrics after a chunk whose kind differs from the earlier chunks."""
+        if self.kind == 'numeric' and self.values:
+            values = pd.Series(np.concatenate(self.values))
+            if self.integer_values:
+                values = values.astype(np.int64)
+            self.value_counts.update(values.value_counts().to_dict())
+        self.kind = 'string'
+        self.values = []
+        self.min = None
+        self.max = None
+    
+    def _update_numeric(self, col):
+        self.integer_values = self.integer_values and pd.api.types.is_integer_dtype(col.dtype)
+        values = col.to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        m = len(values)
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        
+        # Merge the chunk's mean and sum of squared deviations (Chan et al.)
+        total = self.valid + m
+        delta = chunk_mean - self.mean
+        self.mean += delta * m / total
+        self.m2 += chunk_m2 + delta * delta * self.valid * m / total
+        self.valid = total
+        
+        chunk_min, chunk_max = values.min(), values.max()
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.negatives += int(np.count_nonzero(values < 0))
+        self.values.append(values)
+    
+    def metrics(self, column_name):
+        """Return the column's metrics in the analyze_column_quality layout."""
+        n = self.count
+        metrics = {
+            'column_name': column_name,
+            'null_count': self.null_count,
+            'null_percentage': (self.null_count / n) * 100,
+        }
+        
+        # Columns that were null throughout are typed by their dtype, as in
+        # analyze_column_quality
+        kind = self.kind or self.first_kind
+        if kind == 'numeric':
+            values = np.concatenate(self.values) if self.values else np.empty(0)
+            mean = self.mean if self.valid else np.nan
+            std = np.sqrt(self.m2 / (self.valid - 1)) if self.valid > 1 else np.nan
+            metrics.update({
+                'min': self.min if self.valid else np.nan,
+                'max': self.max if self.valid else np.nan,
+                'mean': mean,
+                'median': np.median(values) if self.valid else np.nan,
+                'std': std,
+                'zeros': self.zeros,
+                'zeros_percentage': (self.zeros / n) * 100,
+                'negative_values': self.negatives,
+                'negative_percentage': (self.negatives / n) * 100,
+            })
+            if not np.isnan(std) and std != 0:
+                outliers_count = int(np.count_nonzero(np.abs(values - mean) > 3 * std))
+                metrics['outliers_count'] = outliers_count
+                metrics['outliers_percentage'] = (outliers_count / n) * 100
+            else:
+                metrics['outliers_count'] = 0
+                metrics['outliers_percentage'] = 0
+        elif kind == 'string':
+            unique_values = len(self.value_counts)
+            empty_strings = self.value_counts.get('', 0)
+            lengths = [len(str(value)) for value in self.value_counts] + list(self.null_lengths)
+            metrics.update({
+                'unique_values': unique_values,
+                'unique_percentage': (unique_values / n) * 100,
+                'max_length': max(lengths),
+                'min_length': min(lengths),
+                'empty_strings': empty_strings,
+                'empty_strings_percentage': (empty_strings / n) * 100,
+                'most_common_values': dict(self.value_counts.most_common(5))
+            })
+        elif kind == 'datetime':
+            metrics.update({
+                'min_date': self.min.isoformat(),
+                'max_date': self.max.isoformat(),
+                'range_days': (self.max - self.min).days,
+                'future_dates': self.future_dates,
+                'future_dates_percentage': (self.future_dates / n) * 100
+            })
+        return metrics
+
+# Type-specific analysis for each column kind; 'other' columns only get the basic metrics
+_COLUMN_HANDLERS = {
+    'string': _analyze_string_column,
+    'numeric': _analyze_numeric_column,
+    'datetime': _analyze_datetime_column,
+}
+
 class DataQualityAnalyzer:
     """
     Class for analyzing data quality and generating metrics for visualization.
     """
-    def __init__(self, output_dir='output'):
+    def __init__(self, output_dir='output', max_workers=None):
         """
         Initialize DataQualityAnalyzer instance.
         
         Args:
             output_dir (str): Directory to save output files
+            max_workers (int, optional): Threads used to analyze columns; defaults
+                to the CPU count
         """
         self.output_dir = output_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
         ensure_directory_exists(output_dir)
+        self._reset_stream()
+    
+    def _reset_stream(self):
+        """Clear the running state used by update() and finalize()."""
+        self._stream_columns = {}
+        self._stream_records = 0
+        self._stream_complete = 0
         
-    def analyze_column_quality(self, df, column_name):
+    def analyze_column_quality(self, df, column_name, null_col=None, kind=None):
         """
         Analyze the quality of a specific column in the DataFrame.
         
         Args:
             df (pd.DataFrame): DataFrame to analyze
             column_name (str): Name of the column to analyze
+            null_col (pd.Series, optional): Precomputed null mask for the column
+            kind (str, optional): Precomputed column kind from get_column_kind
             
         Returns:
             dict: Quality metrics for the column
         """
+        # Read the column once and derive every counter from the cached values
+        col = df[column_name]
+        n = len(col)
+        if null_col is None:
+            null_col = col.isnull()
+        null_count = int(null_col.to_numpy().sum())
+        
         # Basic metrics
         metrics = {
             'column_name': column_name,
-            'null_count': df[column_name].isnull().sum(),
-            'null_percentage': (df[column_name].isnull().sum() / len(df)) * 100,
+            'null_count': null_count,
+            'null_percentage': (null_count / n) * 100,
         }
         
         # Column type-specific metrics
-        if df[column_name].dtype == 'object':
-            # String-based analysis
-            metrics.update({
-                'unique_values': df[column_name].nunique(),
-                'unique_percentage': (df[column_name].nunique() / len(df)) * 100,
-                'max_length': df[column_name].astype(str).str.len().max(),
-                'min_length': df[column_name].astype(str).str.len().min(),
-                'empty_strings': (df[column_name] == '').sum(),
-                'empty_strings_percentage': ((df[column_name] == '').sum() / len(df)) * 100
-            })
-            
-            # Most common values
-            value_counts = df[column_name].value_counts().head(5).to_dict()
-            metrics['most_common_values'] = value_counts
-            
-        elif np.issubdtype(df[column_name].dtype, np.number):
-            # Numeric analysis
-            metrics.update({
-                'min': df[column_name].min(),
-                'max': df[column_name].max(),
-                'mean': df[column_name].mean(),
-                'median': df[column_name].median(),
-                'std': df[column_name].std(),
-                'zeros': (df[column_name] == 0).sum(),
-                'zeros_percentage': ((df[column_name] == 0).sum() / len(df)) * 100,
-                'negative_values': (df[column_name] < 0).sum(),
-                'negative_percentage': ((df[column_name] < 0).sum() / len(df)) * 100,
-            })
-            
-            # Outlier detection (values outside 3 standard deviations)
-            if not pd.isna(metrics['std']) and metrics['std'] != 0:
-                mean = metrics['mean']
-                std = metrics['std']
-                outliers = df[(df[column_name] < mean - 3 * std) | (df[column_name] > mean + 3 * std)][column_name]
-                metrics['outliers_count'] = len(outliers)
-                metrics['outliers_percentage'] = (len(outliers) / len(df)) * 100
-            else:
-                metrics['outliers_count'] = 0
-                metrics['outliers_percentage'] = 0
-                
-        elif pd.api.types.is_datetime64_dtype(df[column_name]):
-            # Date/time analysis
-            metrics.update({
-                'min_date': df[column_name].min().isoformat(),
-                'max_date': df[column_name].max().isoformat(),
-                'range_days': (df[column_name].max() - df[column_name].min()).days,
-                'future_dates': (df[column_name] > pd.Timestamp.now()).sum(),
-                'future_dates_percentage': ((df[column_name] > pd.Timestamp.now()).sum() / len(df)) * 100
-            })
+        if kind is None:
+            kind = get_column_kind(col.dtype)
+        handler = _COLUMN_HANDLERS.get(kind)
+        if handler is not None:
+            metrics.update(handler(col, n))
             
         return metrics
     
+    def _analyze_column_safe(self, df, column, null_col, kind):
+        """
+        Analyze a column, returning an error entry instead of raising.
+        
+        Args:
+            df (pd.DataFrame): DataFrame to analyze
+            column (str): Name of the column to analyze
+            null_col (pd.Series): Precomputed null mask for the column
+            kind (str): Column kind from get_column_kind
+            
+        Returns:
+            dict: Quality metrics for the column, or an error entry
+        """
+        try:
+            return self.analyze_column_quality(df, column, null_col=null_col, kind=kind)
+        except Exception as e:
+            logger.error(f"Error analyzing column {column}: {str(e)}")
+            return {
+                'column_name': column,
+                'error': str(e)
+            }
+    
     def analyze_dataframe_quality(self, df):
         """
         Analyze the quality of all columns in the DataFrame.
@@ -113,34 +477,97 @@ class DataQualityAnalyzer:
         Returns:
             dict: Quality metrics for the entire DataFrame
         """
+        # Columns of a frame built from a row-major 2D array are strided views;
+        # copy once into column-major storage so every column scan is contiguous
+        if has_strided_columns(df):
+            df = df.copy()
+        
+        # Compute the null mask for the whole frame once and share it with every column
+        null_mask = df.isnull()
+        complete_records = int(np.logical_not(null_mask.to_numpy()).all(axis=1).sum())
+        
         # Overall metrics
         overall_metrics = {
             'record_count': len(df),
             'column_count': len(df.columns),
             'timestamp': datetime.now().isoformat(),
-            'complete_records': (df.notnull().all(axis=1)).sum(),
-            'complete_records_percentage': ((df.notnull().all(axis=1)).sum() / len(df)) * 100,
+            'complete_records': complete_records,
+            'complete_records_percentage': (complete_records / len(df)) * 100,
         }
         
-        # Column-specific metrics
+        # Column-specific metrics; columns are independent and NumPy releases
+        # the GIL, so analyze them in parallel threads
+        columns = list(df.columns)
+        kinds = {column: get_column_kind(dtype) for column, dtype in df.dtypes.items()}
         column_metrics = {}
+        if columns:
+            with ThreadPoolExecutor(max_workers=min(len(columns), self.max_workers)) as executor:
+                results = executor.map(
+                    lambda column: self._analyze_column_safe(df, column, null_mask[column], kinds[column]),
+                    columns
+                )
+                column_metrics = dict(zip(columns, results))
+        
+        # Calculate heatmap data
+        heatmap_data = self.calculate_heatmap_data(df, column_metrics)
+        
+        return {
+            'overall': overall_metrics,
+            'columns': column_metrics,
+            'heatmap': heatmap_data
+        }
+    
+    def update(self, df):
+        """
+        Add a chunk of records to the running quality metrics.
+        
+        Use this with finalize() to analyze data that is read in chunks, e.g.
+        from pd.read_sql_query(..., chunksize=...), without holding it all in memory.
+        
+        Args:
+            df (pd.DataFrame): Next chunk of records; every chunk must have the same columns
+        """
+        null_mask = df.isnull()
+        self._stream_records += len(df)
+        self._stream_complete += int(np.logical_not(null_mask.to_numpy()).all(axis=1).sum())
         for column in df.columns:
+            accumulator = self._stream_columns.get(column)
+            if accumulator is None:
+                accumulator = self._stream_columns[column] = _ColumnAccumulator()
+            accumulator.update(df[column], null_mask[column])
+    
+    def finalize(self):
+        """
+        Compute the quality metrics for all chunks passed to update() and reset the running state.
+        
+        Returns:
+            dict: Quality metrics in the same layout as analyze_dataframe_quality
+        """
+        record_count = self._stream_records
+        overall_metrics = {
+            'record_count': record_count,
+            'column_count': len(self._stream_columns),
+            'timestamp': datetime.now().isoformat(),
+            'complete_records': self._stream_complete,
+            'complete_records_percentage': (self._stream_complete / record_count) * 100,
+        }
+        
+        column_metrics = {}
+        for column, accumulator in self._stream_columns.items():
             try:
-                column_metrics[column] = self.analyze_column_quality(df, column)
+                column_metrics[column] = accumulator.metrics(column)
             except Exception as e:
                 logger.error(f"Error analyzing column {column}: {str(e)}")
                 column_metrics[column] = {
                     'column_name': column,
                     'error': str(e)
                 }
-        
-        # Calculate heatmap data
-        heatmap_data = self.calculate_heatmap_data(df, column_metrics)
+        self._reset_stream()
         
         return {
             'overall': overall_metrics,
             'columns': column_metrics,
-            'heatmap': heatmap_data
+            'heatmap': self._heatmap_from_metrics(column_metrics, record_count)
         }
     
     def calculate_heatmap_data(self, df, column_metrics):
@@ -154,8 +581,22 @@ class DataQualityAnalyzer:
         Returns:
             dict: Heatmap-ready data structure
         """
+        return self._heatmap_from_metrics(column_metrics, len(df))
+    
+    def _heatmap_from_metrics(self, column_metrics, record_count):
+        """
+        Calculate heatmap data from column metrics and the number of analyzed records.
+        
+        Args:
+            column_metrics (dict): Metrics for individual columns
+            record_count (int): Number of records analyzed
+            
+        Returns:
+            dict: Heatmap-ready data structure
+        """
+        metric_values = list(column_metrics.values())
         heatmap_data = {
-            'columns': [],
+            'columns': list(column_metrics),
             'metrics': [
                 'completeness',
                 'validity',
@@ -165,61 +606,32 @@ class DataQualityAnalyzer:
             ],
             'data': []
         }
+        if not metric_values:
+            return heatmap_data
         
-        # Process each column
-        for column, metrics in column_metrics.items():
-            heatmap_data['columns'].append(column)
+        # Gather each metric across all columns into one array (missing metrics count as 0)
+        def gather(key):
+            return np.array([metrics.get(key, 0) for metrics in metric_values], dtype=float)
+        
+        try:
+            null_pct = gather('null_percentage')
+            empty_pct = gather('empty_strings_percentage')
+            negative_pct = gather('negative_percentage')
+            unique_pct = gather('unique_percentage')
+            outliers_pct = gather('outliers_percentage')
             
-            # Skip columns with errors
-            if 'error' in metrics:
-                heatmap_data['data'].append([0, 0, 0, 0, 0])
-                continue
-                
-            # Calculate quality scores (0-100)
-            try:
-                # Completeness: 100 - null_percentage
-                completeness = 100 - metrics.get('null_percentage', 0)
-                
-                # Validity score based on column type
-                validity = 100
-                if 'empty_strings_percentage' in metrics:
-                    validity -= metrics['empty_strings_percentage']
-                if 'negative_percentage' in metrics and metrics.get('negative_percentage', 0) > 0:
-                    # Adjust if negative values are not valid for this column (domain-specific)
-                    validity -= metrics['negative_percentage']
-                
-                # Consistency score
-                consistency = 100
-                if 'unique_percentage' in metrics:
-                    # For categorical columns, high uniqueness might indicate inconsistency
-                    if metrics['unique_percentage'] > 95 and len(df) > 100:
-                        consistency = 100 - (metrics['unique_percentage'] - 95) * 20
-                
-                # Outliers score: 100 - outliers_percentage
-                outliers = 100
-                if 'outliers_percentage' in metrics:
-                    outliers = 100 - metrics.get('outliers_percentage', 0)
-                
-                # Overall score: average of other scores
-                overall_score = (completeness + validity + consistency + outliers) / 4
-                
-                # Ensure scores are between 0 and 100
-                completeness = max(0, min(100, completeness))
-                validity = max(0, min(100, validity))
-                consistency = max(0, min(100, consistency))
-                outliers = max(0, min(100, outliers))
-                overall_score = max(0, min(100, overall_score))
-                
-                heatmap_data['data'].append([
-                    completeness,
-                    validity,
-                    consistency,
-                    outliers,
-                    overall_score
-                ])
-            except Exception as e:
-                logger.error(f"Error calculating heatmap data for column {column}: {str(e)}")
-                heatmap_data['data'].append([0, 0, 0, 0, 0])
+            # Calculate quality scores (0-100) for all columns at once
+            scores = compute_heatmap_scores(
+                null_pct, empty_pct, negative_pct, unique_pct, outliers_pct, record_count
+            )
+            
+            # Columns that failed analysis score 0 across the board
+            failed = np.array(['error' in metrics for metrics in metric_values], dtype=bool)
+            scores[failed] = 0
+            heatmap_data['data'] = scores.tolist()
+        except Exception as e:
+            logger.error(f"Error calculating heatmap data: {str(e)}")
+            heatmap_data['data'] = [[0, 0, 0, 0, 0] for _ in metric_values]
         
         return heatmap_data
     
@@ -236,14 +648,25 @@ class DataQualityAnalyzer:
         """
         # Analyze data quality
         quality_metrics = self.analyze_dataframe_quality(df)
+        return self.write_quality_report(quality_metrics, report_name)
+    
+    def write_quality_report(self, quality_metrics, report_name='data_quality_report'):
+        """
+        Write JSON, CSV summary and heatmap files for computed quality metrics.
         
+        Args:
+            quality_metrics (dict): Metrics from analyze_dataframe_quality or finalize
+            report_name (str): Base name for the report files
+            
+        Returns:
+            dict: Paths to the generated report files
+        """
         # Generate timestamp for file names
         timestamp = get_timestamp()
         
         # Save JSON report
         json_path = os.path.join(self.output_dir, f"{report_name}_{timestamp}.json")
-        with open(json_path, 'w') as f:
-            json.dump(quality_metrics, f, indent=2)
+        write_json(json_path, quality_metrics)
         
         # Save CSV summary report
         csv_path = os.path.join(self.output_dir, f"{report_name}_summary_{timestamp}.csv")
@@ -270,12 +693,14 @@ class DataQualityAnalyzer:
             summary_data.append(row)
             
         summary_df = pd.DataFrame(summary_data)
-        summary_df.to_csv(csv_path, index=False)
+        if pa is not None:
+            pacsv.write_csv(pa.Table.from_pandas(summary_df, preserve_index=False), csv_path)
+        else:
+            summary_df.to_csv(csv_path, index=False)
         
         # Save heatmap data in a separate JSON file for the visualization
         heatmap_path = os.path.join(self.output_dir, f"{report_name}_heatmap_{timestamp}.json")
-        with open(heatmap_path, 'w') as f:
-            json.dump(quality_metrics['heatmap'], f, indent=2)
+        write_json(heatmap_path, quality_metrics['heatmap'])
         
         return {
             'json_report': json_path,
@@ -2,12 +2,18 @@
 Data validation module for CountyDataSync ETL process.
 Provides validation rules for checking data quality and integrity.
 """
+import copy
 import logging
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 import sqlite3
 import os
 
+from etl.utils import GEO_READ_OPTIONS, connect_sqlite
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +22,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def quartiles(values):
+    """
+    Get the first and third quartiles of an array.
+    
+    Matches Series.quantile's linear interpolation, but selects the needed
+    order statistics with np.partition in linear time instead of sorting.
+    
+    Args:
+        values (np.ndarray): Float values; NaNs are ignored
+        
+    Returns:
+        tuple: (Q1, Q3), both NaN if there are no values
+    """
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return np.nan, np.nan
+    
+    positions = (n - 1) * np.array([0.25, 0.75])
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, n - 1)
+    selected = np.partition(values, np.unique(np.concatenate([lower, upper])))
+    
+    # Interpolate the same way as NumPy's 'linear' percentile method
+    a, b, t = selected[lower], selected[upper], positions - lower
+    q = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    return q[0], q[1]
+
 def validate_parcel_data(df):
     """
     Validate parcel data against business rules.
@@ -40,23 +74,24 @@ def validate_parcel_data(df):
         results['errors'].append(f"Missing required columns: {', '.join(missing_columns)}")
         results['passed'] = False
     
-    # Check for null values in critical columns
+    # Check parcel IDs for nulls and duplicates
     if 'parcel_id' in df.columns:
-        null_parcel_ids = df['parcel_id'].isnull().sum()
+        parcel_ids = df['parcel_id']
+        null_parcel_ids = int(parcel_ids.isna().sum())
         if null_parcel_ids > 0:
             results['errors'].append(f"Found {null_parcel_ids} records with null parcel_id")
             results['passed'] = False
-    
-    # Check for duplicate parcel IDs
-    if 'parcel_id' in df.columns:
-        duplicate_ids = df['parcel_id'].duplicated().sum()
+        
+        # Every repeat of a value (including repeated nulls) is a duplicate, so
+        # one hash-based distinct count replaces the duplicated() pass
+        duplicate_ids = len(parcel_ids) - parcel_ids.nunique(dropna=False)
         if duplicate_ids > 0:
             results['errors'].append(f"Found {duplicate_ids} duplicate parcel IDs")
             results['passed'] = False
     
     # Check for geometries (if this is a GeoDataFrame)
     if isinstance(df, gpd.GeoDataFrame) and 'geometry' in df.columns:
-        invalid_geoms = df.geometry.is_valid.value_counts().get(False, 0)
+        invalid_geoms = np.count_nonzero(~shapely.is_valid(df.geometry.values))
         if invalid_geoms > 0:
             results['errors'].append(f"Found {invalid_geoms} invalid geometries")
             results['passed'] = False
@@ -64,17 +99,19 @@ def validate_parcel_data(df):
     # Check for outliers in land_value (if present)
     if 'land_value' in df.columns:
         # Use IQR method to find outliers
-        Q1 = df['land_value'].quantile(0.25)
-        Q3 = df['land_value'].quantile(0.75)
+        values = df['land_value'].to_numpy(dtype=float, na_value=np.nan)
+        Q1, Q3 = quartiles(values)
         IQR = Q3 - Q1
         lower_bound = Q1 - (1.5 * IQR)
         upper_bound = Q3 + (1.5 * IQR)
-        outliers = df[(df['land_value'] < lower_bound) | (df['land_value'] > upper_bound)]
         
-        if len(outliers) > 0:
-            outlier_percentage = (len(outliers) / len(df)) * 100
+        # Only the number of outliers is reported, so count the mask directly
+        outlier_count = np.count_nonzero((values < lower_bound) | (values > upper_bound))
+        
+        if outlier_count > 0:
+            outlier_percentage = (outlier_count / len(df)) * 100
             results['warnings'].append(
-                f"Found {len(outliers)} outliers in land_value ({outlier_percentage:.2f}%)"
+                f"Found {outlier_count} outliers in land_value ({outlier_percentage:.2f}%)"
             )
     
     # Log validation results
@@ -91,6 +128,21 @@ def validate_stats_db(db_path):
     """
     Validate the statistics database structure and contents.
     
+    Results are cached per file and reused until its modification time or size
+    changes.
+    
+    Args:
+        db_path (str): Path to the SQLite stats database
+        
+    Returns:
+        dict: Validation results
+    """
+    return _cached_validation(_validate_stats_db_cached, _validate_stats_db, db_path)
+
+def _validate_stats_db(db_path):
+    """
+    Validate the statistics database structure and contents (uncached).
+    
     Args:
         db_path (str): Path to the SQLite stats database
         
@@ -109,7 +161,7 @@ def validate_stats_db(db_path):
         return results
     
     try:
-        conn = sqlite3.connect(db_path)
+        conn = connect_sqlite(db_path)
         cursor = conn.cursor()
         
         # Check if required tables exist
@@ -142,6 +194,21 @@ def validate_geo_db(gpkg_path):
     """
     Validate the GeoPackage database.
     
+    Results are cached per file and reused until its modification time or size
+    changes.
+    
+    Args:
+        gpkg_path (str): Path to the GeoPackage file
+        
+    Returns:
+        dict: Validation results
+    """
+    return _cached_validation(_validate_geo_db_cached, _validate_geo_db, gpkg_path)
+
+def _validate_geo_db(gpkg_path):
+    """
+    Validate the GeoPackage database (uncached).
+    
     Args:
         gpkg_path (str): Path to the GeoPackage file
         
@@ -161,7 +228,7 @@ def validate_geo_db(gpkg_path):
     
     try:
         # Open the GeoPackage
-        gdf = gpd.read_file(gpkg_path)
+        gdf = gpd.read_file(gpkg_path, **GEO_READ_OPTIONS)
         
         # Check for empty GeoPackage
         if len(gdf) == 0:
@@ -170,9 +237,8 @@ def validate_geo_db(gpkg_path):
             return results
         
         # Check for valid geometries
-        invalid_geoms = ~gdf.geometry.is_valid
-        if invalid_geoms.any():
-            invalid_count = invalid_geoms.sum()
+        invalid_count = np.count_nonzero(~shapely.is_valid(gdf.geometry.values))
+        if invalid_count:
             results['errors'].append(f"Found {invalid_count} invalid geometries in GeoPackage")
             results['passed'] = False
         
@@ -189,6 +255,42 @@ def validate_geo_db(gpkg_path):
     
     return results
 
+@lru_cache(maxsize=32)
+def _validate_stats_db_cached(file_key):
+    """Validate the stats database identified by a (path, mtime, size) key."""
+    return _validate_stats_db(file_key[0])
+
+@lru_cache(maxsize=32)
+def _validate_geo_db_cached(file_key):
+    """Validate the GeoPackage identified by a (path, mtime, size) key."""
+    return _validate_geo_db(file_key[0])
+
+def _cached_validation(cached_validator, validator, path):
+    """
+    Run a file validator through its cache, keyed by the file's path, mtime and size.
+    
+    Args:
+        cached_validator: lru_cache-wrapped validator taking the file key
+        validator: Uncached validator, used when the file does not exist
+        path (str): Path to the file to validate
+        
+    Returns:
+        dict: Validation results (a copy, so callers may modify it)
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return validator(path)
+    file_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    return copy.deepcopy(cached_validator(file_key))
+
+def clear_validation_cache():
+    """
+    Discard cached stats DB and GeoPackage validation results.
+    """
+    _validate_stats_db_cached.cache_clear()
+    _validate_geo_db_cached.cache_clear()
+
 def run_all_validations(parcel_data=None, stats_db_path=None, geo_db_path=None):
     """
     Run all validations on ETL data and outputs.
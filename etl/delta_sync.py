@@ -3,15 +3,25 @@ Delta synchronization module for CountyDataSync ETL process.
 Provides functionality for incremental updates to the databases.
 """
 import os
+import json
 import time
+import shutil
 import logging
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 import sqlite3
-import hashlib
 from datetime import datetime
 
-from etl.utils import get_timestamp, ensure_directory_exists
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder
+    orjson = None
+
+from etl.utils import (
+    GEO_READ_OPTIONS, GEO_WRITE_OPTIONS, connect_sqlite, get_timestamp, ensure_directory_exists
+)
 
 # Set up logging
 logging.basicConfig(
@@ -21,43 +31,184 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Schema for the per-record change detection hashes; WITHOUT ROWID stores the
+# rows in the parcel_id primary key B-tree itself
+RECORD_HASHES_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS {table} (
+    parcel_id TEXT PRIMARY KEY,
+    hash_value INTEGER NOT NULL,
+    last_updated TEXT NOT NULL
+) WITHOUT ROWID
+'''
+
+# Object column kinds (pd.api.types.infer_dtype) hashed as numbers
+HASH_NUMERIC_KINDS = {'integer', 'floating', 'mixed-integer-float', 'decimal', 'boolean'}
+
 class DeltaSync:
     """
     Class for handling delta-based ETL updates
     """
-    def __init__(self, source_connection=None, working_db=None):
+    def __init__(self, source_connection=None, working_db=None, log_dir='logs'):
         """
         Initialize DeltaSync instance
         
         Args:
             source_connection: Connection to the source database
             working_db (str): Path to the working database
+            log_dir (str): Directory the change log is streamed to
         """
         self.source_connection = source_connection
         self.working_db = working_db or 'output/working_db.sqlite'
-        self.change_log = []
+        self.log_dir = log_dir
+        self.change_count = 0
+        self._change_log_file = None
+        self._change_log_path = None
+        self._conn = None
+        
+    def _connect(self):
+        """
+        Open a connection to the working database in WAL mode
+        
+        Returns:
+            sqlite3.Connection: Open database connection
+        """
+        return connect_sqlite(self.working_db, wal=True)
+    
+    @property
+    def conn(self):
+        """
+        Connection to the working database, opened on first use and kept for
+        the lifetime of this instance (until close() is called)
+        
+        Returns:
+            sqlite3.Connection: Open database connection
+        """
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+    
+    def close(self):
+        """
+        Close the working database connection and the change log if they are open
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._change_log_file is not None:
+            self._change_log_file.close()
+            self._change_log_file = None
+    
+    def log_changes(self, changes):
+        """
+        Append change events to the change log as JSON lines
         
-    def calculate_hash(self, record):
+        The log file is opened on the first event and written as changes are
+        identified, so the events are never held in memory.
+        
+        Args:
+            changes (iterable): Change events (dicts with action, parcel_id and timestamp)
+        """
+        if self._change_log_file is None:
+            ensure_directory_exists(self.log_dir)
+            self._change_log_path = os.path.join(
+                self.log_dir, f'delta_changes_{get_timestamp()}.jsonl'
+            )
+            self._change_log_file = open(self._change_log_path, 'wb')
+        
+        if orjson is not None:
+            lines = (orjson.dumps(change) + b'\n' for change in changes)
+        else:
+            lines = ((json.dumps(change) + '\n').encode('utf-8') for change in changes)
+        
+        for line in lines:
+            self._change_log_file.write(line)
+            self.change_count += 1
+    
+    def calculate_hash(self, record, cols=None):
         """
         Calculate a hash value for a record to detect changes
         
         Args:
             record (dict): Record to hash
+            cols (list, optional): Pre-sorted columns to hash, so callers hashing
+                many records can skip sorting the keys of each one
             
         Returns:
-            str: Hash value for the record
+            int: Hash value for the record
         """
-        # Create a sorted string representation of the record, excluding geometry
-        # which is handled separately
-        record_copy = record.copy()
-        if 'geometry' in record_copy:
-            del record_copy['geometry']
+        return int(self.calculate_hashes(pd.DataFrame([record]), cols).iloc[0])
+    
+    @staticmethod
+    def hash_columns(columns):
+        """
+        Get the columns that take part in record hashes, in hashing order
+        
+        Args:
+            columns (iterable): Column names
             
-        # Create a string with keys and values in sorted order
-        record_str = ''.join([f"{k}:{record_copy[k]}" for k in sorted(record_copy.keys())])
+        Returns:
+            list: Sorted column names, excluding geometry which is handled separately
+        """
+        return sorted(col for col in columns if col != 'geometry')
+    
+    @staticmethod
+    def normalize_hash_frame(frame):
+        """
+        Cast columns to the canonical dtypes records are hashed with
         
-        # Generate MD5 hash
-        return hashlib.md5(record_str.encode()).hexdigest()
+        pandas' row hash depends on the dtype as well as the value, and the
+        same data can come back with different dtypes (an int column read as
+        float once it holds a NULL, object vs string columns). Numeric and
+        boolean columns are hashed as float64 and all other columns as strings,
+        with every kind of null mapped to the same value, so a record hashes
+        the same however its columns were typed.
+        
+        Args:
+            frame (pd.DataFrame): Columns to hash
+            
+        Returns:
+            pd.DataFrame: Frame with canonical dtypes, aligned with frame
+        """
+        columns = {}
+        for col in frame.columns:
+            values = frame[col]
+            nulls = values.isna()
+            if (nulls.all()
+                    or pd.api.types.is_numeric_dtype(values.dtype)
+                    or pd.api.types.is_bool_dtype(values.dtype)
+                    or pd.api.types.infer_dtype(values, skipna=True) in HASH_NUMERIC_KINDS):
+                # All-null columns come back from SQLite as object, so they are
+                # hashed like an all-NaN numeric column
+                columns[col] = values.to_numpy(dtype='float64', na_value=np.nan)
+                continue
+            if pd.api.types.is_datetime64_any_dtype(values.dtype):
+                # Same text sqlite3 stores for datetimes
+                values = values.map(lambda value: value.isoformat(' '), na_action='ignore')
+            text = values.astype(str).to_numpy(dtype=object)
+            text[nulls.to_numpy()] = None
+            columns[col] = text
+        return pd.DataFrame(columns, index=frame.index)
+    
+    def calculate_hashes(self, df, cols=None):
+        """
+        Calculate hash values for all records in a DataFrame at once
+        
+        Hashes are only used for change detection, so pandas' vectorized
+        non-cryptographic row hash is used rather than a cryptographic digest.
+        Columns are normalized first (see normalize_hash_frame) so the hashes
+        do not depend on dtypes. Values are stored as signed 64-bit integers to
+        fit SQLite's INTEGER type.
+        
+        Args:
+            df (pd.DataFrame): Records to hash
+            cols (list, optional): Pre-sorted columns to hash (see hash_columns)
+            
+        Returns:
+            pd.Series: Hash value for each record, aligned with df's index
+        """
+        frame = self.normalize_hash_frame(df[cols if cols is not None else self.hash_columns(df.columns)])
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        return pd.Series(hashes.view(np.int64), index=df.index)
     
     def get_last_sync_info(self):
         """
@@ -70,7 +221,7 @@ class DeltaSync:
             return None
             
         try:
-            conn = sqlite3.connect(self.working_db)
+            conn = self.conn
             cursor = conn.cursor()
             
             # Check if sync_metadata table exists
@@ -96,9 +247,6 @@ class DeltaSync:
         except sqlite3.Error as e:
             logger.error(f"Error getting last sync info: {str(e)}")
             return None
-        finally:
-            if conn:
-                conn.close()
     
     def initialize_working_db(self):
         """
@@ -110,7 +258,7 @@ class DeltaSync:
         ensure_directory_exists(os.path.dirname(self.working_db))
         
         try:
-            conn = sqlite3.connect(self.working_db)
+            conn = self.conn
             cursor = conn.cursor()
             
             # Create sync_metadata table if it doesn't exist
@@ -124,39 +272,75 @@ class DeltaSync:
                 deleted_records INTEGER
             )
             ''')
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sync_metadata_timestamp "
+                "ON sync_metadata (sync_timestamp DESC)"
+            )
             
             # Create record_hashes table if it doesn't exist
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS record_hashes (
-                parcel_id TEXT PRIMARY KEY,
-                hash_value TEXT NOT NULL,
-                last_updated TEXT NOT NULL
-            )
-            ''')
+            cursor.execute(RECORD_HASHES_SCHEMA.format(table='record_hashes'))
+            self._migrate_record_hashes(cursor)
             
             conn.commit()
             return True
         except sqlite3.Error as e:
             logger.error(f"Error initializing working DB: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
+    
+    def _migrate_record_hashes(self, cursor):
+        """
+        Rebuild a record_hashes table created with an older schema
+        
+        Tables holding MD5 hex digests are converted to integer hashes; the old
+        digests cannot be converted, so every hash is reset to 0 and all
+        existing records are treated as updated on the next sync. Integer
+        tables that still use a rowid are copied into a WITHOUT ROWID table.
+        
+        Args:
+            cursor (sqlite3.Cursor): Cursor on the working database
+        """
+        cursor.execute("PRAGMA table_info(record_hashes)")
+        column_types = {row[1]: row[2].upper() for row in cursor.fetchall()}
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='record_hashes'")
+        without_rowid = 'WITHOUT ROWID' in cursor.fetchone()[0].upper()
+        
+        integer_hashes = column_types.get('hash_value') == 'INTEGER'
+        if integer_hashes and without_rowid:
+            return
+        
+        logger.info("Migrating record_hashes to the current schema")
+        if not integer_hashes:
+            cursor.execute("SELECT COUNT(*) FROM record_hashes")
+            stale_count = cursor.fetchone()[0]
+            if stale_count:
+                logger.warning(
+                    f"record_hashes holds {stale_count} MD5 hashes that cannot be converted; "
+                    f"the next sync will report every existing record as updated (one-time full re-sync)"
+                )
+        hash_value = 'hash_value' if integer_hashes else '0'
+        cursor.execute("ALTER TABLE record_hashes RENAME TO record_hashes_old")
+        cursor.execute(RECORD_HASHES_SCHEMA.format(table='record_hashes'))
+        cursor.execute(f'''
+        INSERT INTO record_hashes (parcel_id, hash_value, last_updated)
+        SELECT parcel_id, {hash_value}, last_updated FROM record_hashes_old
+        ''')
+        cursor.execute("DROP TABLE record_hashes_old")
     
     def get_current_record_hashes(self):
         """
         Get current record hashes from the working database
         
         Returns:
-            dict: Dictionary of parcel_id to hash value
+            pd.Series: Hash values (int64) indexed by parcel_id
         """
-        hashes = {}
+        hashes = pd.Series(dtype='int64', index=pd.Index([], dtype=object, name='parcel_id'),
+                           name='hash_value')
         
         if not os.path.exists(self.working_db):
             return hashes
             
         try:
-            conn = sqlite3.connect(self.working_db)
+            conn = self.conn
             cursor = conn.cursor()
             
             # Check if record_hashes table exists
@@ -164,54 +348,51 @@ class DeltaSync:
             if not cursor.fetchone():
                 return hashes
                 
-            # Get all record hashes
-            cursor.execute("SELECT parcel_id, hash_value FROM record_hashes")
-            rows = cursor.fetchall()
-            
-            for row in rows:
-                hashes[row[0]] = row[1]
-                
-            return hashes
-        except sqlite3.Error as e:
+            # Get all record hashes as one typed Series rather than a dict
+            return pd.read_sql_query(
+                "SELECT parcel_id, hash_value FROM record_hashes", conn, index_col='parcel_id'
+            )['hash_value'].astype('int64')
+        except (sqlite3.Error, pd.errors.DatabaseError) as e:
             logger.error(f"Error getting record hashes: {str(e)}")
             return hashes
-        finally:
-            if conn:
-                conn.close()
     
-    def update_record_hashes(self, new_hashes):
+    def update_record_hashes(self, new_hashes, deleted_ids=None, timestamp=None):
         """
         Update record hashes in the working database
         
         Args:
             new_hashes (dict): Dictionary of parcel_id to hash value
+            deleted_ids (list, optional): Parcel IDs to remove from the stored hashes
+            timestamp (str, optional): ISO timestamp of the sync; defaults to now
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.working_db)
-            cursor = conn.cursor()
+            conn = self.conn
             
-            timestamp = datetime.now().isoformat()
+            timestamp = timestamp or datetime.now().isoformat()
             
-            # Update record hashes
-            for parcel_id, hash_value in new_hashes.items():
-                cursor.execute('''
+            # Write all hashes in one transaction with a single prepared statement
+            with conn:
+                conn.executemany('''
                 INSERT OR REPLACE INTO record_hashes (parcel_id, hash_value, last_updated)
                 VALUES (?, ?, ?)
-                ''', (parcel_id, hash_value, timestamp))
+                ''', ((parcel_id, hash_value, timestamp) for parcel_id, hash_value in new_hashes.items()))
+                
+                # Forget deleted records so they are not reported as deleted again
+                if deleted_ids:
+                    conn.executemany(
+                        "DELETE FROM record_hashes WHERE parcel_id = ?",
+                        ((parcel_id,) for parcel_id in deleted_ids)
+                    )
             
-            conn.commit()
             return True
         except sqlite3.Error as e:
             logger.error(f"Error updating record hashes: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
     
-    def record_sync_metadata(self, record_count, added, updated, deleted):
+    def record_sync_metadata(self, record_count, added, updated, deleted, timestamp=None):
         """
         Record metadata about the current synchronization
         
@@ -220,15 +401,16 @@ class DeltaSync:
             added (int): Number of added records
             updated (int): Number of updated records
             deleted (int): Number of deleted records
+            timestamp (str, optional): ISO timestamp of the sync; defaults to now
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.working_db)
+            conn = self.conn
             cursor = conn.cursor()
             
-            timestamp = datetime.now().isoformat()
+            timestamp = timestamp or datetime.now().isoformat()
             
             cursor.execute('''
             INSERT INTO sync_metadata (sync_timestamp, record_count, added_records, updated_records, deleted_records)
@@ -240,9 +422,6 @@ class DeltaSync:
         except sqlite3.Error as e:
             logger.error(f"Error recording sync metadata: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
     
     def identify_changes(self, df):
         """
@@ -252,90 +431,154 @@ class DeltaSync:
             df (pd.DataFrame): DataFrame with current data
             
         Returns:
-            tuple: (added_records, updated_records, unchanged_records, deleted_record_ids)
+            tuple: (added_records, updated_records, unchanged_count, deleted_record_ids)
         """
-        # Initialize
-        added_records = []
-        updated_records = []
-        unchanged_records = []
+        # One timestamp for the change log, record hashes and metadata of this sync
+        timestamp = datetime.now().isoformat()
         
         # Get current record hashes
         current_hashes = self.get_current_record_hashes()
         
-        # Calculate new hashes for all records
-        new_hashes = {}
-        for _, row in df.iterrows():
-            parcel_id = str(row['parcel_id'])
-            record_hash = self.calculate_hash(row.to_dict())
-            new_hashes[parcel_id] = record_hash
-            
-            if parcel_id not in current_hashes:
-                added_records.append(row)
-                self.change_log.append({
-                    'action': 'add',
-                    'parcel_id': parcel_id,
-                    'timestamp': datetime.now().isoformat()
-                })
-            elif current_hashes[parcel_id] != record_hash:
-                updated_records.append(row)
-                self.change_log.append({
-                    'action': 'update',
-                    'parcel_id': parcel_id,
-                    'timestamp': datetime.now().isoformat()
-                })
-            else:
-                unchanged_records.append(row)
+        # Calculate new hashes for all records at once
+        parcel_ids = df['parcel_id'].astype(str)
+        record_hashes = self.calculate_hashes(df)
+        new_hashes = dict(zip(parcel_ids, record_hashes.tolist()))
+        
+        # Classify every record against the stored hashes with boolean masks;
+        # the stored hash of each record is looked up by position so the 64-bit
+        # values are compared exactly
+        positions = current_hashes.index.get_indexer(parcel_ids)
+        added_mask = positions < 0
+        updated_mask = ~added_mask
+        updated_mask[updated_mask] = (
+            current_hashes.to_numpy()[positions[updated_mask]]
+            != record_hashes.to_numpy()[updated_mask]
+        )
+        changed_mask = added_mask | updated_mask
         
-        # Identify deleted records
-        deleted_record_ids = [
-            parcel_id for parcel_id in current_hashes
-            if parcel_id not in new_hashes
-        ]
+        actions = np.where(added_mask[changed_mask], 'add', 'update')
+        self.log_changes(
+            {'action': action, 'parcel_id': parcel_id, 'timestamp': timestamp}
+            for action, parcel_id in zip(actions, parcel_ids[changed_mask])
+        )
+        
+        added_records = df[added_mask]
+        updated_records = df[updated_mask]
+        # Unchanged rows are only counted, never copied
+        unchanged_count = len(df) - int(np.count_nonzero(changed_mask))
         
-        for parcel_id in deleted_record_ids:
-            self.change_log.append({
-                'action': 'delete',
-                'parcel_id': parcel_id,
-                'timestamp': datetime.now().isoformat()
-            })
+        # Identify deleted records (sorted so the change log is deterministic)
+        deleted_record_ids = sorted(current_hashes.index.difference(parcel_ids, sort=False))
+        self.log_changes(
+            {'action': 'delete', 'parcel_id': parcel_id, 'timestamp': timestamp}
+            for parcel_id in deleted_record_ids
+        )
         
         # Update record hashes in the working DB
-        self.update_record_hashes(new_hashes)
+        self.update_record_hashes(new_hashes, deleted_record_ids, timestamp=timestamp)
         
         # Record sync metadata
         self.record_sync_metadata(
             record_count=len(df),
             added=len(added_records),
             updated=len(updated_records),
-            deleted=len(deleted_record_ids)
+            deleted=len(deleted_record_ids),
+            timestamp=timestamp
         )
         
-        return (
-            pd.DataFrame(added_records) if added_records else pd.DataFrame(),
-            pd.DataFrame(updated_records) if updated_records else pd.DataFrame(),
-            pd.DataFrame(unchanged_records) if unchanged_records else pd.DataFrame(),
-            deleted_record_ids
-        )
+        return added_records, updated_records, unchanged_count, deleted_record_ids
     
-    def save_change_log(self, output_dir='logs'):
+    def save_change_log(self, output_dir=None):
         """
-        Save the change log to a file
+        Finish the change log file
         
         Args:
-            output_dir (str): Directory to save the change log
+            output_dir (str, optional): Directory to move the change log to,
+                if different from the directory it was streamed to
             
         Returns:
-            str: Path to the change log file
+            str: Path to the change log file (JSON lines)
         """
-        ensure_directory_exists(output_dir)
+        # Write an empty log if no changes were identified
+        if self._change_log_file is None:
+            self.log_changes([])
         
-        timestamp = get_timestamp()
-        log_file = os.path.join(output_dir, f'delta_changes_{timestamp}.json')
+        self._change_log_file.close()
+        self._change_log_file = None
+        log_file = self._change_log_path
         
-        pd.DataFrame(self.change_log).to_json(log_file, orient='records', indent=2)
+        if output_dir is not None and os.path.abspath(output_dir) != os.path.abspath(self.log_dir):
+            ensure_directory_exists(output_dir)
+            log_file = shutil.move(log_file, os.path.join(output_dir, os.path.basename(log_file)))
         
         return log_file
     
+    def _apply_geo_db_delta(self, gdf, geo_db_path, added, updated, deleted_ids):
+        """
+        Apply delta changes to an existing GeoPackage in place
+        
+        Added and updated records are appended to the feature layer, then the
+        deleted records and the previous versions of the updated records are
+        removed with SQL. The append is committed by the GeoPackage driver
+        before the removal runs, so if a later step fails the appended rows
+        (those above the layer's previous last rowid) are deleted again before
+        the error is re-raised.
+        
+        Args:
+            gdf (gpd.GeoDataFrame): Original GeoDataFrame
+            geo_db_path (str): Path to the GeoPackage
+            added (pd.DataFrame): Added records
+            updated (pd.DataFrame): Updated records
+            deleted_ids (list): List of deleted record IDs
+        """
+        # Only records with geometry can be written to the GeoPackage
+        changed = [frame for frame in (added, updated)
+                   if not frame.empty and 'geometry' in frame.columns]
+        replaced_ids = list(deleted_ids)
+        if not updated.empty and 'geometry' in updated.columns:
+            replaced_ids.extend(updated['parcel_id'].astype(str))
+        
+        conn = connect_sqlite(geo_db_path)
+        try:
+            row = conn.execute(
+                "SELECT table_name FROM gpkg_contents WHERE data_type = 'features' LIMIT 1"
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"No feature layer found in {geo_db_path}")
+            layer = row[0]
+            
+            # Rows at or below this rowid predate the records appended below
+            last_rowid = conn.execute(f'SELECT MAX(rowid) FROM "{layer}"').fetchone()[0] or 0
+            
+            try:
+                if changed:
+                    logger.info(f"Adding {len(added)} new and {len(updated)} modified records to GeoPackage")
+                    changed_gdf = gpd.GeoDataFrame(
+                        pd.concat(changed, ignore_index=True), geometry='geometry', crs=gdf.crs
+                    )
+                    changed_gdf.to_file(geo_db_path, driver="GPKG", layer=layer, mode='a', **GEO_WRITE_OPTIONS)
+                
+                with conn:
+                    conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{layer}_parcel_id" ON "{layer}" (parcel_id)'
+                    )
+                    if replaced_ids:
+                        logger.info(f"Removing {len(replaced_ids)} deleted or superseded records from GeoPackage")
+                        conn.executemany(
+                            f'DELETE FROM "{layer}" WHERE parcel_id = ? AND rowid <= ?',
+                            [(parcel_id, last_rowid) for parcel_id in replaced_ids]
+                        )
+            except Exception:
+                # Take back the rows appended above so the layer is as it was
+                try:
+                    with conn:
+                        conn.execute(f'DELETE FROM "{layer}" WHERE rowid > ?', (last_rowid,))
+                except sqlite3.Error as e:
+                    logger.error(f"Could not remove the rows appended to the GeoPackage: {str(e)}")
+                raise
+        finally:
+            conn.close()
+    
     def update_geo_db(self, gdf, geo_db_path, added, updated, deleted_ids):
         """
         Update the GeoPackage with delta changes
@@ -353,43 +596,53 @@ class DeltaSync:
         # If the GeoPackage doesn't exist, create it with the full dataset
         if not os.path.exists(geo_db_path):
             logger.info(f"GeoPackage does not exist, creating new one at {geo_db_path}")
-            gdf.to_file(geo_db_path, driver="GPKG")
+            gdf.to_file(geo_db_path, driver="GPKG", **GEO_WRITE_OPTIONS)
+            return geo_db_path
+        
+        # Apply the delta in place so the I/O is proportional to the number of
+        # changed records rather than the size of the GeoPackage
+        try:
+            self._apply_geo_db_delta(gdf, geo_db_path, added, updated, deleted_ids)
             return geo_db_path
+        except Exception as e:
+            logger.warning(f"In-place GeoPackage update failed, rewriting the file: {str(e)}")
         
         try:
             # Read the existing GeoPackage
-            existing_gdf = gpd.read_file(geo_db_path)
+            existing_gdf = gpd.read_file(geo_db_path, **GEO_READ_OPTIONS)
             
-            # Handle deleted records
+            # Collect the IDs to drop (deleted records, the old versions of
+            # updated records and any added rows left by a failed in-place
+            # update) and the new rows, then rebuild with one concat
+            remove_ids = set(map(str, deleted_ids))
+            parts = []
             if deleted_ids:
                 logger.info(f"Removing {len(deleted_ids)} deleted records from GeoPackage")
-                existing_gdf = existing_gdf[~existing_gdf['parcel_id'].astype(str).isin(deleted_ids)]
             
-            # Convert added records to GeoDataFrame if not empty
+            # Ensure geometry column is properly set for the added records
             if not added.empty:
                 logger.info(f"Adding {len(added)} new records to GeoPackage")
-                # Ensure geometry column is properly set for the added records
                 if 'geometry' in added.columns:
                     added_gdf = gpd.GeoDataFrame(added, geometry='geometry', crs=gdf.crs)
-                    # Append to existing
-                    existing_gdf = pd.concat([existing_gdf, added_gdf], ignore_index=True)
+                    remove_ids.update(added_gdf['parcel_id'].astype(str))
+                    parts.append(added_gdf)
             
-            # Update changed records
             if not updated.empty:
                 logger.info(f"Updating {len(updated)} modified records in GeoPackage")
-                # Convert to GeoDataFrame if needed
                 if 'geometry' in updated.columns:
                     updated_gdf = gpd.GeoDataFrame(updated, geometry='geometry', crs=gdf.crs)
-                    
-                    # Remove the old versions of these records
-                    updated_ids = updated_gdf['parcel_id'].astype(str).tolist()
-                    existing_gdf = existing_gdf[~existing_gdf['parcel_id'].astype(str).isin(updated_ids)]
-                    
-                    # Add the updated records
-                    existing_gdf = pd.concat([existing_gdf, updated_gdf], ignore_index=True)
+                    remove_ids.update(updated_gdf['parcel_id'].astype(str))
+                    parts.append(updated_gdf)
+            
+            if remove_ids:
+                # Index by parcel_id so the rows are dropped with hash lookups
+                existing_gdf.index = existing_gdf['parcel_id'].astype(str)
+                existing_gdf = existing_gdf.drop(index=list(remove_ids), errors='ignore').reset_index(drop=True)
+            if parts:
+                existing_gdf = pd.concat([existing_gdf] + parts, ignore_index=True)
             
             # Save the updated GeoDataFrame back to the GeoPackage
-            existing_gdf.to_file(geo_db_path, driver="GPKG")
+            existing_gdf.to_file(geo_db_path, driver="GPKG", **GEO_WRITE_OPTIONS)
             
             return geo_db_path
         except Exception as e:
@@ -400,9 +653,31 @@ class DeltaSync:
                 os.rename(geo_db_path, backup_path)
                 logger.warning(f"Failed to update GeoPackage, original backed up to {backup_path}")
             
-            gdf.to_file(geo_db_path, driver="GPKG")
+            gdf.to_file(geo_db_path, driver="GPKG", **GEO_WRITE_OPTIONS)
             return geo_db_path
     
+    @staticmethod
+    def _delete_stats_rows(conn, parcel_ids):
+        """
+        Delete parcel_stats rows by parcel_id
+        
+        The IDs are staged in a temporary table and deleted with a single join,
+        which avoids SQLite's bound-variable limit and the cost of parsing a
+        very long IN (?, ?, ...) list.
+        
+        Args:
+            conn (sqlite3.Connection): Open stats database connection
+            parcel_ids (iterable): Parcel IDs to delete
+        """
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS delta_ids (parcel_id PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.delta_ids")
+        conn.executemany(
+            "INSERT OR IGNORE INTO temp.delta_ids (parcel_id) VALUES (?)",
+            [(parcel_id,) for parcel_id in parcel_ids]
+        )
+        conn.execute("DELETE FROM parcel_stats WHERE parcel_id IN (SELECT parcel_id FROM temp.delta_ids)")
+        conn.execute("DROP TABLE temp.delta_ids")
+    
     def update_stats_db(self, stats_df, stats_db_path, added, updated, deleted_ids):
         """
         Update the stats database with delta changes
@@ -422,19 +697,18 @@ class DeltaSync:
         # If the stats DB doesn't exist, create it with the full dataset
         if not os.path.exists(stats_db_path):
             logger.info(f"Stats DB does not exist, creating new one at {stats_db_path}")
-            conn = sqlite3.connect(stats_db_path)
+            conn = connect_sqlite(stats_db_path)
             stats_df.to_sql('parcel_stats', conn, if_exists='replace', index=False)
             conn.close()
             return stats_db_path
             
         try:
-            conn = sqlite3.connect(stats_db_path)
+            conn = connect_sqlite(stats_db_path)
             
             # Handle deleted records
             if deleted_ids:
                 logger.info(f"Removing {len(deleted_ids)} deleted records from stats DB")
-                placeholders = ', '.join(['?' for _ in deleted_ids])
-                conn.execute(f"DELETE FROM parcel_stats WHERE parcel_id IN ({placeholders})", deleted_ids)
+                self._delete_stats_rows(conn, deleted_ids)
             
             # Handle added records
             if not added.empty:
@@ -450,9 +724,7 @@ class DeltaSync:
                 updated_stats = prepare_stats_data(updated)
                 
                 # Delete the old versions of these records
-                updated_ids = updated_stats['parcel_id'].astype(str).tolist()
-                placeholders = ', '.join(['?' for _ in updated_ids])
-                conn.execute(f"DELETE FROM parcel_stats WHERE parcel_id IN ({placeholders})", updated_ids)
+                self._delete_stats_rows(conn, updated_stats['parcel_id'].astype(str))
                 
                 # Insert the updated records
                 updated_stats.to_sql('parcel_stats', conn, if_exists='append', index=False)
@@ -469,7 +741,7 @@ class DeltaSync:
                 os.rename(stats_db_path, backup_path)
                 logger.warning(f"Failed to update stats DB, original backed up to {backup_path}")
             
-            conn = sqlite3.connect(stats_db_path)
+            conn = connect_sqlite(stats_db_path)
             stats_df.to_sql('parcel_stats', conn, if_exists='replace', index=False)
             conn.close()
             return stats_db_path
@@ -490,47 +762,51 @@ class DeltaSync:
         """
         start_time = time.time()
         
-        # Initialize working DB if needed
-        if not self.initialize_working_db():
-            logger.error("Failed to initialize working DB")
-            return {
-                'success': False,
-                'error': 'Failed to initialize working DB'
-            }
+        try:
+            # Initialize working DB if needed
+            if not self.initialize_working_db():
+                logger.error("Failed to initialize working DB")
+                return {
+                    'success': False,
+                    'error': 'Failed to initialize working DB'
+                }
         
-        # Identify changes
-        added, updated, unchanged, deleted_ids = self.identify_changes(df)
+            # Identify changes
+            added, updated, unchanged_count, deleted_ids = self.identify_changes(df)
         
-        # Update GeoPackage
-        geo_db_path = self.update_geo_db(
-            gdf, geo_db_path, 
-            added=added if not added.empty else pd.DataFrame(),
-            updated=updated if not updated.empty else pd.DataFrame(),
-            deleted_ids=deleted_ids
-        )
+            # Update GeoPackage
+            geo_db_path = self.update_geo_db(
+                gdf, geo_db_path, 
+                added=added if not added.empty else pd.DataFrame(),
+                updated=updated if not updated.empty else pd.DataFrame(),
+                deleted_ids=deleted_ids
+            )
         
-        # Update Stats DB
-        stats_db_path = self.update_stats_db(
-            stats_df, stats_db_path,
-            added=added if not added.empty else pd.DataFrame(),
-            updated=updated if not updated.empty else pd.DataFrame(),
-            deleted_ids=deleted_ids
-        )
+            # Update Stats DB
+            stats_db_path = self.update_stats_db(
+                stats_df, stats_db_path,
+                added=added if not added.empty else pd.DataFrame(),
+                updated=updated if not updated.empty else pd.DataFrame(),
+                deleted_ids=deleted_ids
+            )
+        
+            # Save change log
+            change_log_path = self.save_change_log()
+        
+            elapsed_time = time.time() - start_time
         
-        # Save change log
-        change_log_path = self.save_change_log()
-        
-        elapsed_time = time.time() - start_time
-        
-        return {
-            'success': True,
-            'geo_db_path': geo_db_path,
-            'stats_db_path': stats_db_path,
-            'working_db_path': self.working_db,
-            'change_log_path': change_log_path,
-            'added_records': len(added),
-            'updated_records': len(updated),
-            'unchanged_records': len(unchanged),
-            'deleted_records': len(deleted_ids),
-            'elapsed_time': elapsed_time
-        }
\ No newline at end of file
+            return {
+                'success': True,
+                'geo_db_path': geo_db_path,
+                'stats_db_path': stats_db_path,
+                'working_db_path': self.working_db,
+                'change_log_path': change_log_path,
+                'added_records': len(added),
+                'updated_records': len(updated),
+                'unchanged_records': unchanged_count,
+                'deleted_records': len(deleted_ids),
+                'elapsed_time': elapsed_time
+            }
+        finally:
+            # Release the working DB connection opened during the sync
+            self.close()
@@ -4,9 +4,16 @@ Responsible for connecting to SQL Server and extracting data from MasterParcels
 Also provides functionality to use test data when SQL Server is not available.
 """
 import os
+import queue
+import time
 import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 import pandas as pd
-from config import SQL_SERVER_CONFIG, USE_TEST_DATA, TEST_DATA_RECORD_COUNT
+from config import (
+    SQL_SERVER_CONFIG, USE_TEST_DATA, TEST_DATA_RECORD_COUNT, EXTRACT_ARRAYSIZE, EXTRACT_PARTITIONS
+)
 
 # Try to import pyodbc, but handle the case where it's not available
 try:
@@ -18,6 +25,39 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Idle SQL Server connections kept for reuse, so repeated extractions do not
+# pay the connect/login handshake each time
+CONNECTION_POOL_SIZE = 4
+_connection_pool = queue.Queue(maxsize=CONNECTION_POOL_SIZE)
+
+# Query for the extracted MasterParcels columns, with an optional WHERE clause
+PARCEL_QUERY = """
+    SELECT id, owner, use_code, acres, assessed_value, geometry
+    FROM MasterParcels
+    {where}
+    ORDER BY id
+"""
+
+# Columns of the schema DataFrames returned by get_table_schema
+SCHEMA_COLUMNS = ['column_name', 'data_type', 'max_length', 'is_nullable']
+
+# Seconds a fetched table schema is reused before INFORMATION_SCHEMA is queried again
+SCHEMA_CACHE_TTL = 300
+
+# Sample schema based on our test data structure
+TEST_DATA_SCHEMA = pd.DataFrame([
+    ('id', 'INT', None, 'NO'),
+    ('owner', 'VARCHAR', 255, 'YES'),
+    ('use_code', 'VARCHAR', 50, 'YES'),
+    ('acres', 'FLOAT', None, 'YES'),
+    ('assessed_value', 'DECIMAL', None, 'YES'),
+    ('geometry', 'VARCHAR', -1, 'YES')  # WKT format
+], columns=SCHEMA_COLUMNS)
+
+def _decimal_to_float(value):
+    """pyodbc output converter: parse the raw DECIMAL text into a float."""
+    return None if value is None else float(value)
+
 def create_connection():
     """
     Create and return a connection to the SQL Server database.
@@ -38,11 +78,57 @@ def create_connection():
         
         # Create connection
         conn = pyodbc.connect(conn_str)
+        
+        # Return DECIMAL/NUMERIC values (e.g. assessed_value) as floats rather than
+        # decimal.Decimal objects, which would leave pandas columns as object dtype
+        for sql_type in (pyodbc.SQL_DECIMAL, pyodbc.SQL_NUMERIC):
+            conn.add_output_converter(sql_type, _decimal_to_float)
         return conn
     except pyodbc.Error as e:
         logger.error(f"Failed to connect to SQL Server: {str(e)}")
         raise
 
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a SQL Server connection from the pool, opening a new one if none are idle.
+    
+    Idle connections are checked with SELECT 1 before being handed out. On exit the
+    connection is returned to the pool, or closed if the pool is full or the block
+    raised an exception.
+    
+    Yields:
+        pyodbc.Connection: Connection to the SQL Server database.
+    """
+    conn = None
+    while conn is None:
+        try:
+            conn = _connection_pool.get_nowait()
+        except queue.Empty:
+            conn = create_connection()
+            break
+        try:
+            conn.cursor().execute("SELECT 1").fetchall()
+        except pyodbc.Error:
+            logger.debug("Discarding stale pooled SQL Server connection")
+            with suppress(pyodbc.Error):
+                conn.close()
+            conn = None
+    
+    try:
+        yield conn
+    except BaseException:
+        with suppress(pyodbc.Error):
+            conn.close()
+        raise
+    
+    try:
+        conn.rollback()
+        _connection_pool.put_nowait(conn)
+    except (pyodbc.Error, queue.Full):
+        with suppress(pyodbc.Error):
+            conn.close()
+
 def use_test_data(record_count=100):
     """
     Use test data instead of connecting to SQL Server.
@@ -56,30 +142,113 @@ def use_test_data(record_count=100):
     from etl.test_data import generate_test_parcel_data
     
     logger.info(f"Generating {record_count} test parcel records")
-    test_df = generate_test_parcel_data(count=record_count)
+    # Keep the generated geometries as shapely objects; transform_data uses them
+    # directly instead of round-tripping through WKT
+    test_df = generate_test_parcel_data(count=record_count, wkt=False)
     
-    # Map test data columns to expected schema
+    # Map test data columns to expected schema by renaming in place
     # Our extract normally returns: id, owner, use_code, acres, assessed_value, geometry
-    mapped_df = pd.DataFrame({
-        'id': test_df['ParcelID'],
-        'owner': test_df['Address'],  # Use address as proxy for owner
-        'use_code': test_df['LandUse'],
-        'acres': test_df['Acres'],
-        'assessed_value': test_df['AssessedValue'],
-        'geometry': test_df['geometry']  # This is already in WKT format
-    })
+    # (address is used as a proxy for owner)
+    mapped_df = test_df.rename(columns={
+        'ParcelID': 'id',
+        'Address': 'owner',
+        'LandUse': 'use_code',
+        'Acres': 'acres',
+        'AssessedValue': 'assessed_value',
+    }, copy=False)[['id', 'owner', 'use_code', 'acres', 'assessed_value', 'geometry']]
     
     logger.info(f"Generated {len(mapped_df)} test records")
     return mapped_df
 
-def extract_data(batch_size=1000):
+def _fetch_parcel_rows(conn, batch_size, where='', params=()):
+    """
+    Run the MasterParcels query once and stream its result set in batches.
+    
+    The query is executed a single time rather than paged with OFFSET/FETCH,
+    which would re-sort and skip rows on every page.
+    
+    Args:
+        conn (pyodbc.Connection): Connection to the SQL Server database.
+        batch_size (int): Minimum number of records to fetch per round trip.
+        where (str): Optional WHERE clause restricting the rows.
+        params (tuple): Parameters for the WHERE clause.
+        
+    Returns:
+        tuple: (column names, list of row tuples)
+    """
+    cursor = conn.cursor()
+    cursor.arraysize = max(batch_size, EXTRACT_ARRAYSIZE)
+    cursor.execute(PARCEL_QUERY.format(where=where), params)
+    columns = [column[0] for column in cursor.description]
+    
+    all_rows = []
+    
+    # Fetch data in batches, keeping the raw rows so the DataFrame is built once
+    while True:
+        rows = cursor.fetchmany(cursor.arraysize)
+        
+        if not rows:
+            break
+            
+        all_rows.extend(tuple(row) for row in rows)
+        logger.debug(f"Fetched batch with {len(rows)} records")
+    
+    cursor.close()
+    return columns, all_rows
+
+def _extract_partitioned(par_num, batch_size):
+    """
+    Fetch MasterParcels over parallel connections.
+    
+    Splits the id range into par_num equal-width partitions and fetches each one
+    on its own pooled connection in a thread (pyodbc releases the GIL during I/O).
+    
+    Args:
+        par_num (int): Number of partitions.
+        batch_size (int): Minimum number of records to fetch in each batch.
+        
+    Returns:
+        pd.DataFrame: Extracted data, ordered by id.
+    """
+    def fetch_partition(bounds):
+        with pooled_connection() as conn:
+            return _fetch_parcel_rows(conn, batch_size, "WHERE id >= ? AND id < ?", bounds)
+    
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        min_id, max_id = cursor.execute("SELECT MIN(id), MAX(id) FROM MasterParcels").fetchone()
+        cursor.close()
+    
+    if min_id is None:
+        logger.warning("No data fetched from MasterParcels table")
+        return pd.DataFrame()
+    
+    # Equal-width, contiguous id ranges covering [min_id, max_id]
+    step = -(-(max_id - min_id + 1) // par_num)
+    partitions = [(lower, min(lower + step, max_id + 1))
+                  for lower in range(min_id, max_id + 1, step)]
+    
+    with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+        results = list(executor.map(fetch_partition, partitions))
+    
+    columns = results[0][0]
+    all_rows = [row for _, rows in results for row in rows]
+    full_df = pd.DataFrame.from_records(all_rows, columns=columns)
+    logger.info(f"Total records fetched: {len(full_df)}")
+    return full_df
+
+def extract_data(batch_size=1000, par_num=None):
     """
     Extract data from MasterParcels table in SQL Server.
     Uses batch processing to handle large datasets.
     Falls back to test data if SQL Server is not available or USE_TEST_DATA is set.
     
     Args:
-        batch_size (int): Number of records to fetch in each batch.
+        batch_size (int): Minimum number of records to fetch in each batch; batches
+            are at least EXTRACT_ARRAYSIZE rows so each round trip returns many rows.
+        par_num (int, optional): Number of id-range partitions to fetch in parallel;
+            defaults to EXTRACT_PARTITIONS. With 1 the table is read with a single
+            query, which is also the fallback if the partitioned fetch fails.
         
     Returns:
         pd.DataFrame: Extracted data.
@@ -89,39 +258,26 @@ def extract_data(batch_size=1000):
         logger.info("Using test data instead of connecting to SQL Server")
         return use_test_data(record_count=TEST_DATA_RECORD_COUNT)
     
+    if par_num is None:
+        par_num = EXTRACT_PARTITIONS
+    
+    if par_num > 1:
+        logger.info(f"Extracting data from MasterParcels table in {par_num} partitions")
+        try:
+            return _extract_partitioned(par_num, batch_size)
+        except Exception as e:
+            logger.error(f"Parallel data extraction failed: {str(e)}")
+            logger.info("Falling back to a single extraction query")
+    
     logger.info("Extracting data from MasterParcels table")
     
     try:
-        conn = create_connection()
-        
-        # Query to fetch data in batches
-        query = """
-            SELECT id, owner, use_code, acres, assessed_value, geometry
-            FROM MasterParcels
-            ORDER BY id
-            OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
-        """
+        with pooled_connection() as conn:
+            columns, all_rows = _fetch_parcel_rows(conn, batch_size)
         
-        offset = 0
-        all_batches = []
-        
-        # Fetch data in batches
-        while True:
-            logger.debug(f"Fetching batch with offset {offset} and size {batch_size}")
-            df_batch = pd.read_sql(query, conn, params=[offset, batch_size])
-            
-            if df_batch.empty:
-                break
-                
-            all_batches.append(df_batch)
-            offset += batch_size
-            logger.debug(f"Fetched batch with {len(df_batch)} records")
-        
-        conn.close()
-        
-        # Combine all batches into a single DataFrame
-        if all_batches:
-            full_df = pd.concat(all_batches, ignore_index=True)
+        # Build a single DataFrame from all fetched rows
+        if all_rows:
+            full_df = pd.DataFrame.from_records(all_rows, columns=columns)
             logger.info(f"Total records fetched: {len(full_df)}")
             return full_df
         else:
@@ -140,19 +296,41 @@ def get_test_data_schema():
     Returns:
         pd.DataFrame: Schema information for test data.
     """
-    # Sample schema based on our test data structure
-    schema_data = [
-        ('id', 'INT', None, 'NO'),
-        ('owner', 'VARCHAR', 255, 'YES'),
-        ('use_code', 'VARCHAR', 50, 'YES'),
-        ('acres', 'FLOAT', None, 'YES'),
-        ('assessed_value', 'DECIMAL', None, 'YES'),
-        ('geometry', 'VARCHAR', -1, 'YES')  # WKT format
-    ]
-    
-    schema_df = pd.DataFrame(schema_data, columns=['column_name', 'data_type', 'max_length', 'is_nullable'])
+    return TEST_DATA_SCHEMA.copy()
+
+@functools.lru_cache(maxsize=8)
+def _fetch_schema(server, database, table, ttl_bucket):
+    """
+    Query INFORMATION_SCHEMA for a table's columns.
+    
+    Results are cached per (server, database, table); ttl_bucket changes every
+    SCHEMA_CACHE_TTL seconds so stale entries stop being hit. Errors are raised,
+    and therefore not cached.
+    
+    Returns:
+        pd.DataFrame: Table schema information.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Query to get column information
+        cursor.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE "
+            "FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ?",
+            table
+        )
+        
+        # Build the DataFrame straight from the cursor, without an intermediate list
+        schema_df = pd.DataFrame.from_records(iter(cursor), columns=SCHEMA_COLUMNS)
+        
+        cursor.close()
+    
     return schema_df
 
+def clear_schema_cache():
+    """Forget cached table schemas so the next get_table_schema call queries SQL Server."""
+    _fetch_schema.cache_clear()
+
 def get_table_schema():
     """
     Get schema information for the MasterParcels table.
@@ -167,22 +345,14 @@ def get_table_schema():
         return get_test_data_schema()
     
     try:
-        conn = create_connection()
-        cursor = conn.cursor()
-        
-        # Query to get column information
-        cursor.execute("SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = 'MasterParcels'")
-        
-        # Fetch all rows
-        schema_data = cursor.fetchall()
-        
-        # Create DataFrame from results
-        schema_df = pd.DataFrame(schema_data, columns=['column_name', 'data_type', 'max_length', 'is_nullable'])
-        
-        cursor.close()
-        conn.close()
-        
-        return schema_df
+        schema_df = _fetch_schema(
+            SQL_SERVER_CONFIG['server'],
+            SQL_SERVER_CONFIG['database'],
+            'MasterParcels',
+            int(time.monotonic() // SCHEMA_CACHE_TTL)
+        )
+        # Hand out a copy so callers cannot modify the cached frame
+        return schema_df.copy()
         
     except Exception as e:
         logger.error(f"Failed to get table schema: {str(e)}")
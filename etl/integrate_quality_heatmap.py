@@ -8,9 +8,11 @@ quality metrics and heatmap visualizations.
 import os
 import logging
 import pandas as pd
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from etl.data_quality import DataQualityAnalyzer
-from etl.utils import ensure_directory_exists, get_timestamp
+from etl.utils import CSV_READ_OPTIONS, SQL_READ_OPTIONS, ensure_directory_exists, get_timestamp
 
 # Set up logging
 logging.basicConfig(
@@ -20,13 +22,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def analyze_etl_output(job, output_dir='output'):
+# Rows read per chunk when streaming a working DB table into the analyzer
+ANALYSIS_CHUNK_SIZE = 100_000
+
+# Jobs analyzed at the same time by analyze_all_completed_jobs
+MAX_PARALLEL_JOBS = 4
+
+# Plain snapshot of the ETLJob fields used by the analysis, safe to hand to
+# worker threads (ORM instances and their session are not)
+JobOutputs = namedtuple('JobOutputs', ['id', 'job_name', 'source_file', 'stats_db_path', 'working_db_path'])
+
+def job_outputs(job):
     """
-    Analyze the quality of data in an ETL job's output.
+    Copy the fields needed for quality analysis out of an ETLJob.
     
     Args:
         job: ETLJob instance
+        
+    Returns:
+        JobOutputs: Plain tuple with the job's id, name, source file and output paths
+    """
+    return JobOutputs(job.id, job.job_name, job.source_file, job.stats_db_path, job.working_db_path)
+
+def analyze_etl_output(job, output_dir='output', max_workers=None):
+    """
+    Analyze the quality of data in an ETL job's output.
+    
+    Args:
+        job: ETLJob instance or JobOutputs tuple
         output_dir (str): Directory to save quality reports
+        max_workers (int, optional): Threads used to analyze columns
         
     Returns:
         dict: Paths to the generated reports, or None if analysis fails
@@ -39,43 +64,62 @@ def analyze_etl_output(job, output_dir='output'):
     
     # Determine the data source based on job information
     data = None
+    analyzer = DataQualityAnalyzer(output_dir=job_output_dir, max_workers=max_workers)
     
     try:
-        # If the job has a working DB path, try to extract data from there
+        # If the job has a working DB path, stream data from there chunk by chunk
         if job.working_db_path and os.path.exists(job.working_db_path):
             import sqlite3
             conn = sqlite3.connect(job.working_db_path)
             # Try to get data from the parcels table (or another main data table)
-            tables = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table'", conn)
-            if 'parcels' in tables['name'].values:
-                data = pd.read_sql_query("SELECT * FROM parcels", conn)
-            elif len(tables) > 0:
+            cursor = conn.cursor()
+            row = cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", ('parcels',)
+            ).fetchone()
+            if row is None:
                 # Get data from the first table
-                table_name = tables['name'].iloc[0]
-                data = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+                row = cursor.execute("SELECT name FROM sqlite_master WHERE type='table' LIMIT 1").fetchone()
+            cursor.close()
+            table_name = row[0] if row is not None else None
+            
+            record_count = 0
+            if table_name is not None:
+                for chunk in pd.read_sql_query(f"SELECT * FROM {table_name}", conn,
+                                               chunksize=ANALYSIS_CHUNK_SIZE, **SQL_READ_OPTIONS):
+                    analyzer.update(chunk)
+                    record_count += len(chunk)
             conn.close()
+            
+            if record_count > 0:
+                report_paths = analyzer.write_quality_report(
+                    analyzer.finalize(),
+                    report_name=f"job_{job.id}_quality"
+                )
+                logger.info(f"Data quality analysis completed for job {job.id}. Reports saved to: {job_output_dir}")
+                return report_paths
         
         # If no data yet and the job has a source file, try to read that
         if data is None and job.source_file and os.path.exists(job.source_file):
             file_ext = os.path.splitext(job.source_file)[1].lower()
             if file_ext == '.csv':
-                data = pd.read_csv(job.source_file)
+                data = pd.read_csv(job.source_file, **CSV_READ_OPTIONS)
             elif file_ext in ['.xls', '.xlsx']:
                 data = pd.read_excel(job.source_file)
         
-        # If still no data, look for output CSV files
-        if data is None:
-            csv_files = []
-            if job.stats_db_path:
-                csv_dir = os.path.dirname(job.stats_db_path)
-                csv_files = [f for f in os.listdir(csv_dir) if f.endswith('.csv')]
+        # If still no data, look for an output CSV file
+        if data is None and job.stats_db_path:
+            csv_dir = os.path.dirname(job.stats_db_path)
+            with os.scandir(csv_dir or '.') as entries:
+                first_csv = next(
+                    (entry.path for entry in entries if entry.name.endswith('.csv') and entry.is_file()),
+                    None
+                )
                 
-            if csv_files:
-                data = pd.read_csv(os.path.join(csv_dir, csv_files[0]))
+            if first_csv is not None:
+                data = pd.read_csv(first_csv, **CSV_READ_OPTIONS)
         
         # If we have data, analyze it
         if data is not None and not data.empty:
-            analyzer = DataQualityAnalyzer(output_dir=job_output_dir)
             report_paths = analyzer.generate_quality_report(
                 data, 
                 report_name=f"job_{job.id}_quality"
@@ -92,10 +136,36 @@ def analyze_etl_output(job, output_dir='output'):
         return None
 
 
+def _analyzed_job_dirs(output_dir):
+    """
+    Find the job output directories that already contain quality reports.
+    
+    Args:
+        output_dir (str): Directory holding the job_<id> report directories
+        
+    Returns:
+        set: Names of non-empty job directories
+    """
+    if not os.path.isdir(output_dir):
+        return set()
+    analyzed = set()
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith('job_') and entry.is_dir():
+                with os.scandir(entry.path) as reports:
+                    if next(reports, None) is not None:
+                        analyzed.add(entry.name)
+    return analyzed
+
+
 def analyze_all_completed_jobs(jobs, output_dir='output'):
     """
     Analyze data quality for all completed ETL jobs that haven't been analyzed yet.
     
+    Jobs are independent, so up to MAX_PARALLEL_JOBS are analyzed in parallel
+    threads, and the CPU count is split between them for the per-column analysis.
+    Workers only receive JobOutputs tuples, never ORM instances.
+    
     Args:
         jobs: List of ETLJob instances
         output_dir (str): Directory to save quality reports
@@ -104,27 +174,33 @@ def analyze_all_completed_jobs(jobs, output_dir='output'):
         list: List of job IDs that were successfully analyzed
     """
     logger.info(f"Starting data quality analysis for {len(jobs)} jobs")
-    analyzed_jobs = []
+    succeeded = set()
     
-    for job in jobs:
-        try:
-            # Only analyze completed jobs
-            if job.status != 'completed':
-                continue
-                
-            # Check if this job has already been analyzed
-            job_output_dir = os.path.join(output_dir, f"job_{job.id}")
-            if os.path.exists(job_output_dir) and len(os.listdir(job_output_dir)) > 0:
-                # Job already has quality reports
-                continue
-                
-            # Analyze the job
-            report_paths = analyze_etl_output(job, output_dir)
-            if report_paths:
-                analyzed_jobs.append(job.id)
-        
-        except Exception as e:
-            logger.error(f"Error analyzing job {job.id}: {str(e)}")
+    # Only analyze completed jobs that have no quality reports yet
+    already_analyzed = _analyzed_job_dirs(output_dir)
+    pending = [
+        job_outputs(job) for job in jobs
+        if job.status == 'completed' and f"job_{job.id}" not in already_analyzed
+    ]
+    
+    if pending:
+        cpu_count = os.cpu_count() or 1
+        job_workers = min(MAX_PARALLEL_JOBS, len(pending), cpu_count)
+        column_workers = max(1, cpu_count // job_workers)
+        with ThreadPoolExecutor(max_workers=job_workers) as executor:
+            futures = {
+                executor.submit(analyze_etl_output, job, output_dir, column_workers): job
+                for job in pending
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    if future.result():
+                        succeeded.add(job.id)
+                except Exception as e:
+                    logger.error(f"Error analyzing job {job.id}: {str(e)}")
     
+    # Report in job order rather than completion order
+    analyzed_jobs = [job.id for job in pending if job.id in succeeded]
     logger.info(f"Data quality analysis complete. Analyzed {len(analyzed_jobs)} new jobs.")
-    return analyzed_jobs
\ No newline at end of file
+    return analyzed_jobs
@@ -8,12 +8,114 @@ Handles loading data into the three target databases:
 import os
 import logging
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import geopandas as gpd
 from config import OUTPUT_PATHS
+from etl.utils import GEO_WRITE_OPTIONS, connect_sqlite
 
 logger = logging.getLogger(__name__)
 
+# Table definitions for the Stats and Working DBs. The id column is declared
+# without a type or key, as to_sql(if_exists='replace') used to leave it:
+# uploaded files may carry duplicate or non-integer ids ("P-001"), which are
+# stored as given
+STATS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS stats (
+    id,
+    use_code TEXT,
+    acres REAL,
+    assessed_value REAL
+)
+'''
+STATS_COLUMNS = ['id', 'use_code', 'acres', 'assessed_value']
+STATS_INDICES = {
+    'idx_id': 'CREATE INDEX IF NOT EXISTS idx_id ON stats (id)',
+    'idx_use_code': 'CREATE INDEX IF NOT EXISTS idx_use_code ON stats (use_code)',
+}
+
+WORKING_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS working (
+    id,
+    owner TEXT,
+    use_code TEXT
+)
+'''
+WORKING_COLUMNS = ['id', 'owner', 'use_code']
+WORKING_INDICES = {
+    'idx_id': 'CREATE INDEX IF NOT EXISTS idx_id ON working (id)',
+    'idx_owner': 'CREATE INDEX IF NOT EXISTS idx_owner ON working (owner)',
+    'idx_use_code': 'CREATE INDEX IF NOT EXISTS idx_use_code ON working (use_code)',
+}
+
+# Page cache for bulk load sessions (64 MB)
+LOAD_CACHE_SIZE_KB = 65536
+
+# Fraction of free pages above which a loaded database is VACUUMed
+VACUUM_FREE_PAGE_FRACTION = 0.25
+
+def create_indices(conn, indices):
+    """
+    Create table indices if they do not exist yet.
+    
+    Args:
+        conn (sqlite3.Connection): Open database connection
+        indices (dict): Mapping of index name to CREATE INDEX IF NOT EXISTS statement
+    """
+    for statement in indices.values():
+        conn.execute(statement)
+
+def replace_table_rows(conn, table, schema, columns, df, indices=None):
+    """
+    Replace the contents of a table with the rows of a DataFrame.
+    
+    Unlike to_sql(if_exists='replace'), the table is kept and only its rows are
+    replaced, in a single transaction with one prepared INSERT statement. The
+    secondary indices are dropped for the bulk insert and rebuilt once the rows
+    are in, followed by ANALYZE so the query planner has fresh statistics.
+    
+    Args:
+        conn (sqlite3.Connection): Open database connection
+        table (str): Table name
+        schema (str): CREATE TABLE IF NOT EXISTS statement for the table
+        columns (list): Columns to load, in table order
+        df (pd.DataFrame): Rows to load
+        indices (dict, optional): Mapping of index name to CREATE INDEX statement
+    """
+    indices = indices or {}
+    placeholders = ', '.join('?' for _ in columns)
+    conn.execute(f'PRAGMA cache_size=-{LOAD_CACHE_SIZE_KB}')
+    with conn:
+        conn.execute(schema)
+        for name in indices:
+            conn.execute(f'DROP INDEX IF EXISTS {name}')
+        conn.execute(f'DELETE FROM {table}')
+        conn.executemany(
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})',
+            df[columns].itertuples(index=False, name=None)
+        )
+        # Build each index in one pass over the loaded rows
+        create_indices(conn, indices)
+    conn.execute(f'ANALYZE {table}')
+
+def compact_database(conn):
+    """
+    Tidy a database file after a bulk load.
+    
+    Checkpoints and truncates the write-ahead log (a no-op for rollback-journal
+    databases), then VACUUMs the file if more than VACUUM_FREE_PAGE_FRACTION of
+    its pages are free after the old rows were deleted.
+    
+    Args:
+        conn (sqlite3.Connection): Open database connection with no pending transaction
+    """
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if page_count and freelist_count / page_count > VACUUM_FREE_PAGE_FRACTION:
+        logger.debug(f"Vacuuming database: {freelist_count} of {page_count} pages free")
+        conn.execute('VACUUM')
+
 def load_geo_db(gdf, output_file=None):
     """
     Load spatial data into a GeoPackage file.
@@ -36,7 +138,7 @@ def load_geo_db(gdf, output_file=None):
             logger.warning("Empty GeoDataFrame provided for Geo DB loading")
             # Create an empty GeoPackage
             empty_gdf = gpd.GeoDataFrame(geometry=gpd.GeoSeries(), crs='EPSG:4326')
-            empty_gdf.to_file(output_file, driver='GPKG')
+            empty_gdf.to_file(output_file, driver='GPKG', **GEO_WRITE_OPTIONS)
             logger.info(f"Created empty GeoPackage: {output_file}")
             return output_file
             
@@ -44,7 +146,7 @@ def load_geo_db(gdf, output_file=None):
         os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
         
         # Write to GeoPackage
-        gdf.to_file(output_file, driver='GPKG')
+        gdf.to_file(output_file, driver='GPKG', **GEO_WRITE_OPTIONS)
         
         logger.info(f"GeoPackage created successfully at {output_file} with {len(gdf)} features")
         return output_file
@@ -77,17 +179,10 @@ def create_stats_db(db_file=None):
         cursor = conn.cursor()
         
         # Create table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS stats (
-                id INTEGER PRIMARY KEY,
-                use_code TEXT,
-                acres REAL,
-                assessed_value REAL
-            )
-        ''')
-        
-        # Create index on use_code for faster queries
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_use_code ON stats (use_code)')
+        cursor.execute(STATS_SCHEMA)
+        
+        # Create indices for faster queries
+        create_indices(conn, STATS_INDICES)
         
         conn.commit()
         conn.close()
@@ -122,12 +217,12 @@ def load_stats_data(df, db_file=None):
             return db_file
             
         # Connect to SQLite database
-        conn = sqlite3.connect(db_file)
+        conn = connect_sqlite(db_file)
         
-        # Write DataFrame to SQLite
-        df.to_sql('stats', conn, if_exists='replace', index=False)
+        # Replace the table's rows in one transaction, rebuilding indices after the insert
+        replace_table_rows(conn, 'stats', STATS_SCHEMA, STATS_COLUMNS, df, STATS_INDICES)
+        compact_database(conn)
         
-        conn.commit()
         conn.close()
         
         logger.info(f"Data loaded into Stats DB: {len(df)} records")
@@ -161,17 +256,10 @@ def create_working_db(db_file=None):
         cursor = conn.cursor()
         
         # Create table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS working (
-                id INTEGER PRIMARY KEY,
-                owner TEXT,
-                use_code TEXT
-            )
-        ''')
+        cursor.execute(WORKING_SCHEMA)
         
         # Create indices for faster queries
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_owner ON working (owner)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_use_code ON working (use_code)')
+        create_indices(conn, WORKING_INDICES)
         
         conn.commit()
         conn.close()
@@ -206,12 +294,12 @@ def load_working_data(df, db_file=None):
             return db_file
             
         # Connect to SQLite database
-        conn = sqlite3.connect(db_file)
+        conn = connect_sqlite(db_file)
         
-        # Write DataFrame to SQLite
-        df.to_sql('working', conn, if_exists='replace', index=False)
+        # Replace the table's rows in one transaction, rebuilding indices after the insert
+        replace_table_rows(conn, 'working', WORKING_SCHEMA, WORKING_COLUMNS, df, WORKING_INDICES)
+        compact_database(conn)
         
-        conn.commit()
         conn.close()
         
         logger.info(f"Data loaded into Working DB: {len(df)} records")
@@ -221,6 +309,40 @@ def load_working_data(df, db_file=None):
         logger.error(f"Failed to load data into Working DB: {str(e)}")
         raise
 
+def load_all(gdf, stats_df, working_df, geo_db_file=None, stats_db_file=None, working_db_file=None):
+    """
+    Load the Geo, Stats and Working DBs concurrently.
+    
+    The three outputs are independent files, each written through its own
+    connection, so their writes can overlap (GDAL and sqlite3 release the GIL
+    during I/O).
+    
+    Args:
+        gdf (gpd.GeoDataFrame): GeoDataFrame with spatial data
+        stats_df (pd.DataFrame): DataFrame with statistics data
+        working_df (pd.DataFrame): DataFrame with working data
+        geo_db_file (str, optional): Path to output GeoPackage file
+        stats_db_file (str, optional): Path to the Stats SQLite database file
+        working_db_file (str, optional): Path to the Working SQLite database file
+        
+    Returns:
+        dict: Paths to the created files, keyed by 'geo_db', 'stats_db' and 'working_db'
+    """
+    def load_stats():
+        return load_stats_data(stats_df, create_stats_db(stats_db_file))
+    
+    def load_working():
+        return load_working_data(working_df, create_working_db(working_db_file))
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {
+            'geo_db': executor.submit(load_geo_db, gdf, geo_db_file),
+            'stats_db': executor.submit(load_stats),
+            'working_db': executor.submit(load_working)
+        }
+        # result() re-raises the first loader failure in the caller
+        return {name: future.result() for name, future in futures.items()}
+
 if __name__ == "__main__":
     # Test loading with sample data
     logging.basicConfig(level=logging.DEBUG)
@@ -253,12 +375,7 @@ if __name__ == "__main__":
     })
     
     # Test loading into each database
-    geo_db_path = load_geo_db(gdf, 'test_geo.gpkg')
-    
-    stats_db_path = create_stats_db('test_stats.sqlite')
-    load_stats_data(stats_df, stats_db_path)
-    
-    working_db_path = create_working_db('test_working.sqlite')
-    load_working_data(working_df, working_db_path)
+    paths = load_all(gdf, stats_df, working_df,
+                     'test_geo.gpkg', 'test_stats.sqlite', 'test_working.sqlite')
     
-    print(f"Test files created: {geo_db_path}, {stats_db_path}, {working_db_path}")
+    print(f"Test files created: {paths['geo_db']}, {paths['stats_db']}, {paths['working_db']}")
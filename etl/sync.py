@@ -7,16 +7,13 @@ import os
 import time
 from etl.extract import extract_data
 from etl.transform import transform_data, prepare_stats_data, prepare_working_data
-from etl.load import (
-    load_geo_db, 
-    create_stats_db, load_stats_data,
-    create_working_db, load_working_data
-)
+from etl.load import load_all
 from etl.utils import (
     get_memory_usage, 
     get_memory_usage_value, 
     get_cpu_usage, 
-    format_elapsed_time
+    format_elapsed_time,
+    PeakMemorySampler
 )
 
 logger = logging.getLogger(__name__)
@@ -27,7 +24,8 @@ def run_etl(batch_size=1000, job_id=None):
     
     Args:
         batch_size (int): Size of batches for data extraction
-        job_id (int): ID of the ETLJob record for this process
+        job_id (int): ID of the ETLJob record for this process. Job and metric
+            updates are committed at each stage boundary.
         
     Returns:
         dict: Dictionary with paths to the created output files and performance metrics
@@ -44,8 +42,8 @@ def run_etl(batch_size=1000, job_id=None):
     logger.info("Starting ETL process")
     logger.info(f"Current memory usage: {get_memory_usage()}")
     
-    # Initialize peak memory usage
-    peak_memory = get_memory_usage_value()
+    # Track peak memory usage in the background
+    memory_sampler = PeakMemorySampler().start()
     
     try:
         # Step 1: Extract data from SQL Server
@@ -67,9 +65,7 @@ def run_etl(batch_size=1000, job_id=None):
         df = extract_data(batch_size=batch_size)
         extraction_time = time.time() - extraction_start
         
-        # Update peak memory
         current_memory = get_memory_usage_value()
-        peak_memory = max(peak_memory, current_memory)
         
         if df.empty:
             logger.warning("No data extracted. ETL process will create empty output files.")
@@ -113,9 +109,7 @@ def run_etl(batch_size=1000, job_id=None):
         gdf = transform_data(df)
         transformation_time = time.time() - transformation_start
         
-        # Update peak memory
         current_memory = get_memory_usage_value()
-        peak_memory = max(peak_memory, current_memory)
         
         logger.info(f"Transformation completed in {format_elapsed_time(transformation_start)}")
         logger.info(f"Memory usage after transformation: {get_memory_usage()}")
@@ -154,22 +148,12 @@ def run_etl(batch_size=1000, job_id=None):
             db.session.add(metric)
             db.session.commit()
         
-        # Create and load Geo DB
-        geo_db_path = load_geo_db(gdf)
-        
-        # Create and load Stats DB
-        stats_db_path = create_stats_db()
-        load_stats_data(stats_df)
-        
-        # Create and load Working DB
-        working_db_path = create_working_db()
-        load_working_data(working_df)
+        # Create and load the Geo, Stats and Working DBs concurrently
+        output_files = load_all(gdf, stats_df, working_df)
         
         loading_time = time.time() - loading_start
         
-        # Update peak memory
         current_memory = get_memory_usage_value()
-        peak_memory = max(peak_memory, current_memory)
         
         logger.info(f"Loading completed in {format_elapsed_time(loading_start)}")
         logger.info(f"Memory usage after loading: {get_memory_usage()}")
@@ -188,13 +172,7 @@ def run_etl(batch_size=1000, job_id=None):
             db.session.add(metric)
             db.session.commit()
         
-        # Return paths to created files
-        output_files = {
-            'geo_db': geo_db_path,
-            'stats_db': stats_db_path,
-            'working_db': working_db_path
-        }
-        
+        peak_memory = memory_sampler.stop()
         total_time = time.time() - start_time
         logger.info(f"ETL process completed successfully in {format_elapsed_time(start_time)}")
         
@@ -225,13 +203,16 @@ def run_etl(batch_size=1000, job_id=None):
         return output
         
     except Exception as e:
+        memory_sampler.stop()
         logger.error(f"ETL process failed: {str(e)}", exc_info=True)
         
         # Record failure in job if available
         if job:
+            if not db.session.is_active:
+                # A failed commit invalidates the transaction; roll back so the failure can be saved
+                db.session.rollback()
             job.status = 'failed'
             job.error_message = str(e)
-            db.session.commit()
             
             # Create performance metric record for failure
             metric = PerformanceMetric(
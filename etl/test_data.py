@@ -5,47 +5,74 @@ Provides functionality to generate test data for development and testing purpose
 import os
 import pandas as pd
 import numpy as np
-from shapely.geometry import Polygon, Point
-from shapely.wkt import dumps as wkt_dumps
+import shapely
 
-def generate_test_parcel_data(count=100, random_seed=42):
+def generate_parcel_geometries(center_lon, center_lat, scale, is_rectangle, rng=None):
+    """
+    Build parcel polygons for arrays of centers and sizes in vectorized shapely calls.
+    
+    Args:
+        center_lon (np.ndarray): Longitude of each parcel center
+        center_lat (np.ndarray): Latitude of each parcel center
+        scale (np.ndarray): Half-width of each parcel in degrees
+        is_rectangle (np.ndarray): True for rectangular parcels; the others are
+            irregular hexagons
+        rng (np.random.Generator, optional): Random generator for the hexagon vertices
+        
+    Returns:
+        np.ndarray: Array of shapely Polygons
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    count = len(center_lon)
+    geometries = np.empty(count, dtype=object)
+    
+    # Rectangles
+    geometries[is_rectangle] = shapely.box(
+        center_lon[is_rectangle] - scale[is_rectangle],
+        center_lat[is_rectangle] - scale[is_rectangle],
+        center_lon[is_rectangle] + scale[is_rectangle],
+        center_lat[is_rectangle] + scale[is_rectangle]
+    )
+    
+    # More complex polygons (random hexagons), with some randomness in each vertex
+    is_hexagon = ~is_rectangle
+    angles = np.arange(6) * (2 * np.pi / 6)
+    rand_scale = scale[is_hexagon, None] * rng.uniform(0.8, 1.2, (int(is_hexagon.sum()), 6))
+    coords = np.stack([
+        center_lon[is_hexagon, None] + rand_scale * np.cos(angles),
+        center_lat[is_hexagon, None] + rand_scale * np.sin(angles)
+    ], axis=-1)
+    # Close each ring by repeating its first vertex
+    coords = np.concatenate([coords, coords[:, :1]], axis=1)
+    geometries[is_hexagon] = shapely.polygons(coords)
+    
+    return geometries
+
+def generate_test_parcel_data(count=100, random_seed=42, wkt=True):
     """
     Generate synthetic parcel data for testing.
     
+    Every column is drawn as a whole array from one random generator, so the
+    cost is a handful of NumPy calls regardless of count.
+    
     Args:
         count (int): Number of parcels to generate
         random_seed (int): Random seed for reproducibility
+        wkt (bool): Return geometries as WKT strings; if False, the geometry
+            column holds shapely Polygons
         
     Returns:
         pd.DataFrame: DataFrame containing parcel data with geometry in WKT format
+            (or as shapely Polygons)
     """
-    # Set random seed for reproducibility
-    np.random.seed(random_seed)
+    # Random generator seeded for reproducibility
+    rng = np.random.default_rng(random_seed)
     
     # Generate base coordinates (roughly in a state-sized area)
     base_lat = 37.0
     base_lon = -122.0
     
-    # Create empty DataFrame
-    data = {
-        'ParcelID': range(1, count + 1),
-        'Address': [],
-        'City': [],
-        'State': 'CA',
-        'ZipCode': [],
-        'LandUse': [],
-        'ZoningCode': [],
-        'Acres': [],
-        'AssessedValue': [],
-        'SaleDate': [],
-        'SalePrice': [],
-        'YearBuilt': [],
-        'SquareFeet': [],
-        'Bedrooms': [],
-        'Bathrooms': [],
-        'geometry': []
-    }
-    
     # Land use codes
     land_uses = ['Residential', 'Commercial', 'Industrial', 'Agricultural', 'Vacant']
     # City names
@@ -56,108 +83,66 @@ def generate_test_parcel_data(count=100, random_seed=42):
     streets = ['Main St', 'Oak Ave', 'Maple Dr', 'Washington Blvd', 'Lincoln Way', 
               'Jefferson St', 'Park Ave', 'Lake Dr', 'River Rd', 'Mountain View']
     
-    # Generate data for each parcel
-    for i in range(count):
-        # Address
-        street_num = np.random.randint(100, 9999)
-        street = np.random.choice(streets)
-        address = f"{street_num} {street}"
-        data['Address'].append(address)
-        
-        # City
-        city = np.random.choice(cities)
-        data['City'].append(city)
-        
+    # Address
+    street_nums = rng.integers(100, 9999, count)
+    addresses = np.char.add(np.char.add(street_nums.astype(str), ' '), rng.choice(streets, count))
+    
+    # Land Use
+    land_use = rng.choice(land_uses, count)
+    
+    # Acres (0.1 to 10 acres)
+    acres = np.round(rng.uniform(0.1, 10.0, count), 2)
+    
+    # Assessed Value ($100K to $2M)
+    assessed_value = rng.integers(100000, 2000000, count)
+    
+    # Sale Date (within last 10 years)
+    days_back = rng.integers(0, 3650, count)
+    sale_dates = (pd.Timestamp.now() - pd.to_timedelta(days_back, unit='D')).strftime('%Y-%m-%d')
+    
+    # Sale Price (80% to 120% of assessed value)
+    sale_price = (assessed_value * rng.uniform(0.8, 1.2, count)).astype(np.int64)
+    
+    # Square Feet (based on acres, roughly; 10-30% lot coverage)
+    square_feet = (acres * 43560 * rng.uniform(0.1, 0.3, count)).astype(np.int64)
+    
+    # Bedrooms and Bathrooms (for residential only)
+    is_residential = land_use == 'Residential'
+    bedrooms = np.where(is_residential, rng.integers(1, 6, count), 0)
+    bathrooms = np.where(is_residential, rng.integers(1, 4, count), 0)
+    
+    # Generate a random polygon for each parcel
+    # Random offset from base coordinates
+    center_lat = base_lat + rng.uniform(-0.5, 0.5, count)
+    center_lon = base_lon + rng.uniform(-0.5, 0.5, count)
+    
+    # Scale for parcel size (larger for larger acreage)
+    scale = 0.001 * np.sqrt(acres)
+    
+    # 70% are simple rectangles
+    is_rectangle = rng.random(count) < 0.7
+    geometries = generate_parcel_geometries(center_lon, center_lat, scale, is_rectangle, rng)
+    
+    return pd.DataFrame({
+        'ParcelID': np.arange(1, count + 1),
+        'Address': addresses,
+        'City': rng.choice(cities, count),
+        'State': 'CA',
         # Zip Code (5-digit)
-        zip_code = np.random.randint(90000, 96000)
-        data['ZipCode'].append(zip_code)
-        
-        # Land Use
-        land_use = np.random.choice(land_uses)
-        data['LandUse'].append(land_use)
-        
-        # Zoning Code
-        zoning_code = np.random.choice(zoning_codes)
-        data['ZoningCode'].append(zoning_code)
-        
-        # Acres (0.1 to 10 acres)
-        acres = round(np.random.uniform(0.1, 10.0), 2)
-        data['Acres'].append(acres)
-        
-        # Assessed Value ($100K to $2M)
-        assessed_value = np.random.randint(100000, 2000000)
-        data['AssessedValue'].append(assessed_value)
-        
-        # Sale Date (within last 10 years)
-        days_back = np.random.randint(0, 3650)
-        sale_date = pd.Timestamp.now() - pd.Timedelta(days=days_back)
-        data['SaleDate'].append(sale_date.strftime('%Y-%m-%d'))
-        
-        # Sale Price (80% to 120% of assessed value)
-        price_factor = np.random.uniform(0.8, 1.2)
-        sale_price = int(assessed_value * price_factor)
-        data['SalePrice'].append(sale_price)
-        
+        'ZipCode': rng.integers(90000, 96000, count),
+        'LandUse': land_use,
+        'ZoningCode': rng.choice(zoning_codes, count),
+        'Acres': acres,
+        'AssessedValue': assessed_value,
+        'SaleDate': sale_dates,
+        'SalePrice': sale_price,
         # Year Built (1950 to 2023)
-        year_built = np.random.randint(1950, 2024)
-        data['YearBuilt'].append(year_built)
-        
-        # Square Feet (based on acres, roughly)
-        sq_ft = int(acres * 43560 * np.random.uniform(0.1, 0.3))  # 10-30% lot coverage
-        data['SquareFeet'].append(sq_ft)
-        
-        # Bedrooms and Bathrooms (for residential only)
-        if land_use == 'Residential':
-            bedrooms = np.random.randint(1, 6)
-            bathrooms = np.random.randint(1, 4)
-        else:
-            bedrooms = 0
-            bathrooms = 0
-        data['Bedrooms'].append(bedrooms)
-        data['Bathrooms'].append(bathrooms)
-        
-        # Generate a random polygon for the parcel
-        # Random offset from base coordinates
-        lat_offset = np.random.uniform(-0.5, 0.5)
-        lon_offset = np.random.uniform(-0.5, 0.5)
-        
-        center_lat = base_lat + lat_offset
-        center_lon = base_lon + lon_offset
-        
-        # Scale for parcel size (larger for larger acreage)
-        scale = 0.001 * np.sqrt(acres)
-        
-        # Create a simple polygon
-        if np.random.random() < 0.7:  # 70% are simple rectangles
-            # Rectangle
-            points = [
-                (center_lon - scale, center_lat - scale),
-                (center_lon + scale, center_lat - scale),
-                (center_lon + scale, center_lat + scale),
-                (center_lon - scale, center_lat + scale),
-                (center_lon - scale, center_lat - scale)  # Close the polygon
-            ]
-        else:
-            # More complex polygon (random hexagon)
-            points = []
-            for j in range(6):
-                angle = j * (2 * np.pi / 6)
-                # Add some randomness to the shape
-                rand_scale = scale * np.random.uniform(0.8, 1.2)
-                x = center_lon + rand_scale * np.cos(angle)
-                y = center_lat + rand_scale * np.sin(angle)
-                points.append((x, y))
-            # Close the polygon
-            points.append(points[0])
-        
-        # Create a Shapely polygon and convert to WKT
-        polygon = Polygon(points)
-        wkt = wkt_dumps(polygon)
-        data['geometry'].append(wkt)
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    return df
+        'YearBuilt': rng.integers(1950, 2024, count),
+        'SquareFeet': square_feet,
+        'Bedrooms': bedrooms,
+        'Bathrooms': bathrooms,
+        'geometry': shapely.to_wkt(geometries, rounding_precision=-1, trim=False) if wkt else geometries
+    })
 
 def save_test_data(df, output_dir='uploads', filename='test_parcels.csv'):
     """
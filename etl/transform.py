@@ -5,7 +5,7 @@ Handles conversion of WKT to geometry and other data transformations.
 import logging
 import pandas as pd
 import geopandas as gpd
-from shapely import wkt
+import shapely
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,7 @@ def transform_data(df):
     
     Args:
         df (pd.DataFrame): DataFrame with a 'geometry' column containing WKT strings
+            or shapely geometries
         
     Returns:
         gpd.GeoDataFrame: GeoDataFrame with properly typed geometry column
@@ -43,9 +44,14 @@ def transform_data(df):
             logger.warning(f"Removing {null_geoms.sum()} rows with null geometry")
             df_copy = df_copy[~null_geoms]
             
-        # Convert WKT strings to shapely geometries
-        logger.debug("Converting WKT strings to shapely geometries")
-        df_copy['geometry'] = df_copy['geometry'].apply(lambda x: wkt.loads(x) if x else None)
+        # Convert WKT strings to shapely geometries in one vectorized call
+        # (empty strings become missing geometries); columns that already hold
+        # geometries, e.g. generated test data, are used as they are
+        wkt_values = df_copy['geometry'].to_numpy(dtype=object, copy=True)
+        if not shapely.is_geometry(wkt_values).all():
+            logger.debug("Converting WKT strings to shapely geometries")
+            wkt_values[wkt_values == ''] = None
+            df_copy['geometry'] = shapely.from_wkt(wkt_values)
         
         # Convert DataFrame to GeoDataFrame
         logger.debug("Creating GeoDataFrame")
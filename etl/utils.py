@@ -2,9 +2,47 @@
 Utility functions for the ETL process.
 """
 import os
+import re
+import sqlite3
+import threading
 import psutil
 from datetime import datetime
 
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+try:
+    import pyogrio
+except ImportError:
+    pyogrio = None
+
+
+def _version_tuple(version):
+    """Return the leading (major, minor) numbers of a version string or tuple."""
+    if isinstance(version, str):
+        version = re.findall(r'\d+', version)
+    return tuple(int(part) for part in version[:2])
+
+
+# Arrow reads need GDAL>=3.6; Arrow writes need pyogrio>=0.8 built against GDAL>=3.8
+_GDAL_VERSION = _version_tuple(pyogrio.__gdal_version__) if pyogrio is not None else (0, 0)
+_PYOGRIO_VERSION = _version_tuple(pyogrio.__version__) if pyogrio is not None else (0, 0)
+ARROW_GEO_READ = pyarrow is not None and _GDAL_VERSION >= (3, 6)
+ARROW_GEO_WRITE = pyarrow is not None and _PYOGRIO_VERSION >= (0, 8) and _GDAL_VERSION >= (3, 8)
+
+# Keyword arguments for gpd.read_file and GeoDataFrame.to_file: use the
+# vectorized pyogrio engine, and read and write through Arrow when the
+# installed pyarrow, pyogrio and GDAL support it
+GEO_READ_OPTIONS = {'engine': 'pyogrio', 'use_arrow': ARROW_GEO_READ}
+GEO_WRITE_OPTIONS = {'engine': 'pyogrio', 'use_arrow': ARROW_GEO_WRITE}
+
+# Keyword arguments for pd.read_csv and pd.read_sql_query: parse into
+# Arrow-backed columns (and with Arrow's multithreaded CSV reader) when
+# pyarrow is available
+CSV_READ_OPTIONS = {'engine': 'pyarrow', 'dtype_backend': 'pyarrow'} if pyarrow is not None else {}
+SQL_READ_OPTIONS = {'dtype_backend': 'pyarrow'} if pyarrow is not None else {}
+
 
 def ensure_directory_exists(directory):
     """
@@ -31,6 +69,29 @@ def get_timestamp():
     return datetime.now().strftime('%Y%m%d_%H%M%S')
 
 
+def connect_sqlite(db_path, wal=False):
+    """
+    Open a SQLite connection with PRAGMAs tuned for the ETL workload.
+    
+    Args:
+        db_path (str): Path to the SQLite database
+        wal (bool): Switch the database to write-ahead logging with
+            synchronous=NORMAL. Only use this for internal databases: WAL is a
+            persistent property of the file and adds -wal/-shm side files.
+    
+    Returns:
+        sqlite3.Connection: Open database connection
+    """
+    # Wait up to 5 seconds for locks held by other connections
+    conn = sqlite3.connect(db_path, timeout=5)
+    conn.execute("PRAGMA cache_size=-20000")  # 20 MB page cache
+    conn.execute("PRAGMA temp_store=MEMORY")
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
 def get_memory_usage():
     """
     Get the current memory usage of the process.
@@ -46,6 +107,64 @@ def get_memory_usage():
 get_memory_usage_value = get_memory_usage
 
 
+class PeakMemorySampler:
+    """
+    Track peak process memory by sampling on a background thread.
+    
+    Sampling continuously catches transient peaks inside a phase that
+    phase-boundary samples would miss.
+    
+    Usage:
+        sampler = PeakMemorySampler()
+        sampler.start()
+        ...
+        peak_memory = sampler.stop()
+    """
+    
+    def __init__(self, interval=0.25):
+        """
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.peak = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def _sample(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, get_memory_usage())
+    
+    def start(self):
+        """Take an initial sample and start the background sampler."""
+        self.peak = get_memory_usage()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample, name='PeakMemorySampler', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """
+        Stop the background sampler (safe to call more than once).
+        
+        Returns:
+            float: Peak memory usage in MB
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+            self.peak = max(self.peak, get_memory_usage())
+        return self.peak
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
 def get_cpu_usage():
     """
     Get the current CPU usage.
@@ -90,7 +209,8 @@ def check_file_size(file_path):
     Returns:
         float: File size in KB
     """
-    if os.path.exists(file_path):
-        size_bytes = os.path.getsize(file_path)
-        return size_bytes / 1024  # Convert to KB
-    return 0
\ No newline at end of file
+    try:
+        size_bytes = os.stat(file_path).st_size
+    except OSError:
+        return 0
+    return size_bytes / 1024  # Convert to KB
\ No newline at end of file
@@ -5,17 +5,43 @@
 Generate a PyInstaller spec file for packaging CountyDataSync.
 """
 
+import importlib.util
 import os
 import sys
 from pathlib import Path
 
+# Development-only and unused modules that PyInstaller should not analyze or bundle.
+# unittest is kept because numpy.testing imports it at runtime.
+EXCLUDED_MODULES = [
+    'tkinter',
+    'pytest',
+    'hypothesis',
+    'IPython',
+    'notebook',
+    'matplotlib.tests',
+    'numpy.tests',
+    'pandas.tests',
+    'scipy',
+]
+
+
+def icon_needs_update(icon_path, generator_path):
+    """Check if the icon is missing or out of date relative to its generator."""
+    try:
+        icon_mtime = os.stat(icon_path).st_mtime
+    except OSError:
+        return True
+    try:
+        return os.stat(generator_path).st_mtime > icon_mtime
+    except OSError:
+        # Without the generator an existing icon is the best we have
+        return False
+
 
 def generate_spec_file():
     """Generate a PyInstaller spec file."""
-    # Check if PyInstaller is installed
-    try:
-        import PyInstaller
-    except ImportError:
+    # Check if PyInstaller is installed (without importing it)
+    if importlib.util.find_spec('PyInstaller') is None:
         print("PyInstaller is not installed. Please install it with 'pip install pyinstaller'.")
         sys.exit(1)
     
@@ -23,15 +49,18 @@ def generate_spec_file():
     current_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(current_dir, "generated-icon.png")
     
-    # Ensure icon exists
-    if not os.path.exists(icon_path):
+    # Generate the icon if it is missing or older than its generator script
+    if icon_needs_update(icon_path, os.path.join(current_dir, "generate_icon.py")):
         try:
             from generate_icon import generate_icon
-            generate_icon()
+            generate_icon(filename=icon_path)
             print(f"Generated icon at {icon_path}")
         except ImportError:
-            print("Warning: Could not generate icon. Icon will not be included in the executable.")
-            icon_path = None
+            if os.path.exists(icon_path):
+                print("Warning: Could not regenerate icon. Using the existing icon.")
+            else:
+                print("Warning: Could not generate icon. Icon will not be included in the executable.")
+                icon_path = None
 
     # Define the spec file content
     spec_content = f"""# -*- mode: python ; coding: utf-8 -*-
@@ -70,7 +99,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes=[],
+    excludes={EXCLUDED_MODULES!r},
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -91,7 +120,7 @@ exe = EXE(
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
+    upx_exclude=['vcruntime140.dll', 'python3*.dll'],  # UPX-compressed copies of these break on Windows
     runtime_tmpdir=None,
     console=True,
     disable_windowed_traceback=False,
@@ -83,7 +83,7 @@ def check_geopackage(gpkg_file):
     
     try:
         # Read the GeoPackage and count features
-        gdf = gpd.read_file(gpkg_file)
+        gdf = gpd.read_file(gpkg_file, engine='pyogrio')
         count = len(gdf)
         
         logger.info(f"GeoPackage {gpkg_file} has {count} features")
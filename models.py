@@ -5,6 +5,11 @@ from datetime import datetime
 from app import db
 
 class ETLJob(db.Model):
+    # Composite index for the performance reports, which filter and sort on these
+    __table_args__ = (
+        db.Index('idx_etl_job_start_time_end_time', 'start_time', 'end_time'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     job_name = db.Column(db.String(100), nullable=False)
     start_time = db.Column(db.DateTime, default=datetime.utcnow)
@@ -25,7 +30,8 @@ class ETLJob(db.Model):
     peak_memory_usage = db.Column(db.Float, nullable=True)  # Memory in MB
     
     # Relationships
-    performance_metrics = db.relationship('PerformanceMetric', back_populates='job', lazy='dynamic')
+    performance_metrics = db.relationship('PerformanceMetric', back_populates='job',
+                                          order_by='PerformanceMetric.timestamp')
     
     def __repr__(self):
         return f'<ETLJob {self.job_name}>'
@@ -60,6 +66,11 @@ class ETLJob(db.Model):
         return None
 
 class PerformanceMetric(db.Model):
+    # Composite index for per-job metric lookups in timestamp order
+    __table_args__ = (
+        db.Index('idx_performance_metric_job_id_timestamp', 'job_id', 'timestamp'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('etl_job.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
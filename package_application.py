@@ -26,15 +26,18 @@ import subprocess
 import sys
 from datetime import datetime
 import zipfile
-import importlib
 import json
 
-# Constants
-REQUIRED_PACKAGES = [
-    'pandas', 'numpy', 'geopandas', 'pyodbc', 'sqlalchemy', 
-    'shapely', 'psutil', 'python-dotenv', 'flask', 'pyinstaller'
-]
+from check_packaging_readiness import (
+    REQUIRED_PACKAGES,
+    find_missing_packages,
+    is_executable_file,
+    is_python_version_supported,
+    scan_paths,
+    which
+)
 
+# Constants
 # Additional Azure packages that may be needed
 AZURE_PACKAGES = [
     'azure-storage-blob', 'azure-identity', 'azure-mgmt-resource',
@@ -91,7 +94,7 @@ def get_python_executable():
     
     # Try each location
     for location in common_locations:
-        if os.path.exists(location) and os.access(location, os.X_OK):
+        if is_executable_file(location):
             try:
                 result = subprocess.run([location, '--version'], 
                                       capture_output=True, text=True, 
@@ -156,22 +159,18 @@ def check_prerequisites():
         return False
     
     # Check Python version
-    python_version = sys.version_info
-    if python_version.major < 3 or (python_version.major == 3 and python_version.minor < 7):
+    if not is_python_version_supported():
         print("❌ Python 3.7+ is required. Current version:", sys.version)
         return False
     else:
         print(f"✓ Python version: {sys.version}")
     
     # Check required packages
-    missing_packages = []
-    for package in REQUIRED_PACKAGES:
-        try:
-            importlib.import_module(package)
-            print(f"✓ {package} is installed")
-        except ImportError:
-            missing_packages.append(package)
-            print(f"❌ {package} is missing")
+    missing_packages = find_missing_packages(REQUIRED_PACKAGES)
+    print("\n".join(
+        f"❌ {package} is missing" if package in missing_packages else f"✓ {package} is installed"
+        for package in REQUIRED_PACKAGES
+    ))
     
     if missing_packages:
         print("\nMissing packages:", ", ".join(missing_packages))
@@ -203,8 +202,13 @@ def check_spec_file():
         try:
             if os.path.exists('generate_spec.py'):
                 print("Attempting to generate spec file using generate_spec.py...")
-                result = subprocess.run([PYTHON_EXECUTABLE, 'generate_spec.py'],
-                                       check=True, capture_output=True, text=True)
+                # Generate in-process rather than starting a second interpreter
+                from generate_spec import generate_spec_file
+                try:
+                    generate_spec_file()
+                except SystemExit:
+                    # generate_spec exits when PyInstaller is not installed
+                    pass
                 if os.path.exists(spec_file):
                     print(f"✓ Successfully generated {spec_file}")
                     return True
@@ -257,6 +261,15 @@ def build_executable():
         print(f"❌ Build failed with error: {str(e)}")
         return False
 
+# Directories already created by this process
+_ensured_dirs = set()
+
+def ensure_directory(path):
+    """Create a directory (and parents) once per process."""
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
 def copy_documentation(dist_dir):
     """Copy documentation files to distribution directory."""
     print("\nCopying documentation...")
@@ -274,11 +287,12 @@ def copy_documentation(dist_dir):
     
     # Copy each file if it exists
     docs_copied = 0
+    found = scan_paths(doc_files)
     for file in doc_files:
-        if os.path.exists(file):
+        if found[file] == 'file':
             # Create subdirectories if needed
             dest_path = os.path.join(dist_dir, file)
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            ensure_directory(os.path.dirname(dest_path))
             shutil.copy2(file, dest_path)
             print(f"✓ Copied {file}")
             docs_copied += 1
@@ -335,14 +349,8 @@ def create_azure_config(dist_dir):
     
     # Import Azure-specific modules if available
     try:
-        import importlib
         # Check for Azure packages
-        azure_pkgs_missing = []
-        for pkg in AZURE_PACKAGES:
-            try:
-                importlib.import_module(pkg)
-            except ImportError:
-                azure_pkgs_missing.append(pkg)
+        azure_pkgs_missing = find_missing_packages(AZURE_PACKAGES)
         
         if azure_pkgs_missing:
             print(f"\n⚠️ Some Azure packages are missing: {', '.join(azure_pkgs_missing)}")
@@ -352,7 +360,7 @@ def create_azure_config(dist_dir):
     
     # Create azure-config folder
     azure_dir = os.path.join(dist_dir, 'azure-config')
-    os.makedirs(azure_dir, exist_ok=True)
+    ensure_directory(azure_dir)
     
     # Create Azure App Service configuration
     web_config_path = os.path.join(azure_dir, 'web.config')
@@ -632,7 +640,7 @@ def create_directory_structure(dist_dir):
     
     # Create directories
     for directory in ['logs', 'output', 'data', 'config', 'temp']:
-        os.makedirs(os.path.join(dist_dir, directory), exist_ok=True)
+        ensure_directory(os.path.join(dist_dir, directory))
         print(f"✓ Created {directory} directory")
     
     # Create a .keep file in each directory
@@ -710,7 +718,7 @@ def create_windows_installer(dist_dir, version):
     """Create Windows installer using NSIS."""
     try:
         # Check if NSIS is installed
-        nsis_path = shutil.which('makensis')
+        nsis_path = which('makensis')
         if not nsis_path:
             print("❌ NSIS not found. Please install it from https://nsis.sourceforge.io/")
             return False
@@ -755,7 +763,7 @@ def create_macos_installer(dist_dir, version):
     """Create macOS DMG installer."""
     try:
         # Check if create-dmg is installed
-        create_dmg_path = shutil.which('create-dmg')
+        create_dmg_path = which('create-dmg')
         if not create_dmg_path:
             print("❌ create-dmg not found. Install with: brew install create-dmg")
             return False
@@ -806,7 +814,9 @@ def create_distribution_package(version):
     dist_dir = f'CountyDataSync-{version}'
     if os.path.exists(dist_dir):
         shutil.rmtree(dist_dir)
-    os.makedirs(dist_dir)
+    # Forget directories created inside the previous copy of dist_dir
+    _ensured_dirs.clear()
+    ensure_directory(dist_dir)
     
     # Copy executable
     shutil.copy2(exe_path, os.path.join(dist_dir, exe_name))
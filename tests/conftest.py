@@ -0,0 +1,26 @@
+"""
+Shared fixtures for the test suite.
+"""
+import os
+import sys
+import importlib
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+@pytest.fixture(scope='session')
+def flask_app(tmp_path_factory):
+    """The app bound to a fresh SQLite database"""
+    db_path = tmp_path_factory.mktemp('appdb') / 'app.db'
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    app_module = importlib.import_module('app')
+    if app_module.app.config['SQLALCHEMY_DATABASE_URI'] != os.environ['DATABASE_URL']:
+        pytest.skip("app was already imported with another database")
+    app_module.app.config['TESTING'] = True
+    return app_module
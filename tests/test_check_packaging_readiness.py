@@ -0,0 +1,85 @@
+"""
+Tests for the packaging readiness checks and their result cache.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import check_packaging_readiness as readiness
+
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    """Run main() without arguments against an empty cache directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['check_packaging_readiness.py'])
+    return tmp_path / readiness.CACHE_DIR
+
+
+def fake_run(exit_code, calls):
+    def run_readiness_checks():
+        calls.append(exit_code)
+        print(f"checked ({exit_code})")
+        return exit_code
+    return run_readiness_checks
+
+
+@pytest.mark.parametrize('check', [
+    readiness.check_python_version,
+    readiness.check_packages,
+    readiness.check_pyinstaller,
+    readiness.check_files,
+    readiness.check_installer_tools,
+    readiness.check_azure_tools,
+])
+def test_checks_return_result_and_lines(check):
+    result, lines = check()
+    assert isinstance(result, bool)
+    assert lines and all(isinstance(line, str) for line in lines)
+
+
+def test_run_checks_prints_output_in_order(capsys):
+    checks = [
+        ('first', lambda: (True, ['first line'])),
+        ('second', lambda: (False, ['second line'])),
+    ]
+    assert readiness.run_checks(checks) == [('first', True), ('second', False)]
+    assert capsys.readouterr().out == "first line\nsecond line\n"
+
+
+def test_failing_run_is_not_cached(isolated_cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(readiness, 'run_readiness_checks', fake_run(1, calls))
+
+    assert readiness.main() == 1
+    assert readiness.main() == 1
+    assert calls == [1, 1]
+    assert not list(isolated_cache.glob('readiness-*.json'))
+
+
+def test_passing_run_is_cached(isolated_cache, monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(readiness, 'run_readiness_checks', fake_run(0, calls))
+
+    assert readiness.main() == 0
+    assert readiness.main() == 0
+    assert calls == [0]
+    output = capsys.readouterr().out
+    assert output.count("checked (0)") == 2
+    assert "cached result" in output
+
+
+def test_no_cache_flag_reruns_checks(isolated_cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(readiness, 'run_readiness_checks', fake_run(0, calls))
+
+    assert readiness.main() == 0
+    monkeypatch.setattr(sys, 'argv', ['check_packaging_readiness.py', '--no-cache'])
+    assert readiness.main() == 0
+    assert calls == [0, 0]
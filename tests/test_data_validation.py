@@ -0,0 +1,32 @@
+"""
+Tests for parcel data validation.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pandas')
+gpd = pytest.importorskip('geopandas')
+shapely = pytest.importorskip('shapely')
+
+# Add the project root to the Python path; the module logs to logs/
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+os.makedirs(project_root / 'logs', exist_ok=True)
+
+from etl.data_validation import validate_parcel_data
+
+
+def test_invalid_geometry_check_sees_in_place_edits():
+    gdf = gpd.GeoDataFrame({
+        'parcel_id': ['P1', 'P2'],
+        'geometry': [shapely.box(0, 0, 1, 1), shapely.box(1, 1, 2, 2)],
+    }, crs='EPSG:4326')
+    assert not any('invalid geometries' in error for error in validate_parcel_data(gdf)['errors'])
+
+    # A self-intersecting bow tie replaces a valid polygon in place
+    gdf.loc[1, 'geometry'] = shapely.Polygon([(0, 0), (1, 1), (1, 0), (0, 1)])
+    assert 'Found 1 invalid geometries' in validate_parcel_data(gdf)['errors']
@@ -0,0 +1,168 @@
+"""
+Tests for delta synchronization record hashing.
+"""
+import os
+import sys
+import sqlite3
+import logging
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+np = pytest.importorskip('numpy')
+pytest.importorskip('geopandas')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# delta_sync logs to logs/delta_sync.log on import
+os.makedirs(os.path.join(project_root, 'logs'), exist_ok=True)
+
+from etl.delta_sync import DeltaSync
+
+
+def parcel_frame():
+    return pd.DataFrame({
+        'parcel_id': ['P1', 'P2', 'P3'],
+        'units': pd.array([1, 2, None], dtype='Int64'),
+        'acres': [1.5, 2.0, np.nan],
+        'owner': pd.array(['Smith', None, 'Jones'], dtype='string'),
+        'use_code': ['R1', 'C1', None],
+        'vacant': [True, False, True],
+        'notes': [None, None, None],
+        'recorded': pd.to_datetime(['2024-01-01', '2024-02-15 08:30:00', None]),
+    })
+
+
+def test_hashes_survive_sqlite_round_trip(tmp_path):
+    df = parcel_frame()
+    db_file = str(tmp_path / 'round_trip.sqlite')
+    conn = sqlite3.connect(db_file)
+    try:
+        df.to_sql('parcels', conn, index=False)
+        round_trip = pd.read_sql_query("SELECT * FROM parcels", conn)
+    finally:
+        conn.close()
+
+    # The dtypes really do differ after the round trip
+    assert round_trip['units'].dtype != df['units'].dtype
+
+    sync = DeltaSync(working_db=str(tmp_path / 'working.sqlite'), log_dir=str(tmp_path))
+    assert sync.calculate_hashes(round_trip).tolist() == sync.calculate_hashes(df).tolist()
+
+
+def test_hashes_ignore_object_vs_string_dtype(tmp_path):
+    df = parcel_frame()
+    as_object = df.astype({'owner': object, 'units': 'float64'})
+
+    sync = DeltaSync(working_db=str(tmp_path / 'working.sqlite'), log_dir=str(tmp_path))
+    assert sync.calculate_hashes(as_object).tolist() == sync.calculate_hashes(df).tolist()
+
+
+def test_hashes_change_with_values(tmp_path):
+    df = parcel_frame()
+    changed = df.copy()
+    changed.loc[1, 'acres'] = 2.5
+
+    sync = DeltaSync(working_db=str(tmp_path / 'working.sqlite'), log_dir=str(tmp_path))
+    hashes = sync.calculate_hashes(df).tolist()
+    changed_hashes = sync.calculate_hashes(changed).tolist()
+    assert changed_hashes[0] == hashes[0]
+    assert changed_hashes[1] != hashes[1]
+    assert changed_hashes[2] == hashes[2]
+
+
+def test_unchanged_reload_reports_no_updates(tmp_path):
+    df = parcel_frame()
+    sync = DeltaSync(working_db=str(tmp_path / 'working.sqlite'), log_dir=str(tmp_path))
+    try:
+        assert sync.initialize_working_db()
+        added, updated, unchanged, deleted = sync.identify_changes(df)
+        assert len(added) == 3
+
+        added, updated, unchanged, deleted = sync.identify_changes(
+            df.astype({'units': 'float64', 'owner': object})
+        )
+        assert len(added) == 0
+        assert len(updated) == 0
+        assert unchanged == 3
+        assert deleted == []
+    finally:
+        sync.close()
+
+
+def test_md5_hash_migration_logs_full_resync(tmp_path, caplog):
+    db_file = str(tmp_path / 'working.sqlite')
+    conn = sqlite3.connect(db_file)
+    conn.execute(
+        "CREATE TABLE record_hashes (parcel_id TEXT PRIMARY KEY, hash_value TEXT NOT NULL, "
+        "last_updated TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO record_hashes VALUES ('P1', 'd41d8cd98f00b204e9800998ecf8427e', '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+    sync = DeltaSync(working_db=db_file, log_dir=str(tmp_path))
+    try:
+        with caplog.at_level(logging.WARNING, logger='etl.delta_sync'):
+            assert sync.initialize_working_db()
+        assert 'one-time full re-sync' in caplog.text
+
+        added, updated, unchanged, deleted = sync.identify_changes(parcel_frame())
+        assert updated['parcel_id'].tolist() == ['P1']
+    finally:
+        sync.close()
+
+
+class FailingIndexConnection:
+    """sqlite3 connection proxy whose CREATE INDEX fails, like a locked database"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, *args):
+        if sql.lstrip().startswith('CREATE INDEX'):
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, *args)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_failed_geo_db_delta_does_not_duplicate_added_records(tmp_path, monkeypatch):
+    gpd = pytest.importorskip('geopandas')
+    shapely = pytest.importorskip('shapely')
+    import etl.delta_sync
+
+    def parcels(ids, value):
+        return gpd.GeoDataFrame({
+            'parcel_id': ids,
+            'value': [value] * len(ids),
+            'geometry': [shapely.Point(i, i) for i in range(len(ids))],
+        }, crs='EPSG:4326')
+
+    geo_db_path = str(tmp_path / 'geo_db.gpkg')
+    parcels(['P1', 'P2'], 1.0).to_file(geo_db_path, driver='GPKG')
+
+    connect_sqlite = etl.delta_sync.connect_sqlite
+    monkeypatch.setattr(etl.delta_sync, 'connect_sqlite',
+                        lambda path, **kwargs: FailingIndexConnection(connect_sqlite(path, **kwargs)))
+
+    sync = DeltaSync(working_db=str(tmp_path / 'working.sqlite'), log_dir=str(tmp_path))
+    added = parcels(['P3'], 1.0)
+    updated = parcels(['P2'], 2.0)
+    full = pd.concat([parcels(['P1'], 1.0), updated, added], ignore_index=True)
+    sync.update_geo_db(full, geo_db_path, added, updated, [])
+
+    result = gpd.read_file(geo_db_path)
+    assert sorted(result['parcel_id']) == ['P1', 'P2', 'P3']
+    assert result.set_index('parcel_id').loc['P2', 'value'] == 2.0
@@ -0,0 +1,72 @@
+"""
+Tests for the file download route.
+"""
+import os
+import sys
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('geopandas')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+@pytest.fixture
+def x_accel(flask_app, monkeypatch):
+    """Route every download root through nginx under /_protected/"""
+    monkeypatch.setattr(flask_app, 'DOWNLOAD_ROOTS',
+                        {root: '/_protected/' for root in flask_app.DOWNLOAD_ROOTS})
+
+
+@pytest.fixture
+def output_file(flask_app):
+    """A file with a space and a non-ASCII character in the output directory"""
+    path = os.path.join(flask_app.OUTPUT_DIR, 'parcels é 2024.sqlite')
+    with open(path, 'wb') as f:
+        f.write(b'parcel data')
+    yield path
+    os.remove(path)
+
+
+def test_download_serves_output_files(flask_app, output_file):
+    client = flask_app.app.test_client()
+    response = client.get(f"/download/{quote(output_file)}")
+    assert response.status_code == 200
+    assert response.data == b'parcel data'
+
+
+@pytest.mark.parametrize('filename', ['app.py', 'output/../app.py', 'etc/passwd'])
+def test_download_rejects_paths_outside_output(flask_app, monkeypatch, filename):
+    client = flask_app.app.test_client()
+    assert client.get(f"/download/{filename}").status_code == 404
+
+    monkeypatch.setattr(flask_app, 'DOWNLOAD_ROOTS',
+                        {root: '/_protected/' for root in flask_app.DOWNLOAD_ROOTS})
+    assert client.get(f"/download/{filename}").status_code == 404
+
+
+def test_download_x_accel_redirect_is_percent_encoded(flask_app, x_accel, output_file):
+    client = flask_app.app.test_client()
+
+    response = client.get(f"/download/{quote(output_file)}")
+    assert response.status_code == 200
+    # The path is relative to the output directory nginx aliases
+    assert response.headers['X-Accel-Redirect'] == '/_protected/parcels%20%C3%A9%202024.sqlite'
+    disposition = response.headers['Content-Disposition']
+    assert disposition.isascii()
+    assert "filename*=UTF-8''parcels%20%C3%A9%202024.sqlite" in disposition
+
+
+def test_download_x_accel_redirect_names_the_validated_file(flask_app, x_accel, output_file):
+    client = flask_app.app.test_client()
+
+    # A redundant path resolves to the same file, so nginx gets the same redirect
+    response = client.get(f"/download/output/./{quote(os.path.basename(output_file))}")
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/_protected/parcels%20%C3%A9%202024.sqlite'
@@ -0,0 +1,48 @@
+"""
+Tests for the synthetic parcel data generator.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+np = pytest.importorskip('numpy')
+pytest.importorskip('shapely')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from etl.test_data import generate_test_parcel_data
+
+
+def test_generated_data_is_reproducible():
+    first = generate_test_parcel_data(count=25, random_seed=7)
+    second = generate_test_parcel_data(count=25, random_seed=7)
+    pd.testing.assert_frame_equal(first, second)
+    assert first['geometry'].map(type).eq(str).all()
+
+
+def test_generated_data_depends_on_seed():
+    first = generate_test_parcel_data(count=25, random_seed=7)
+    second = generate_test_parcel_data(count=25, random_seed=8)
+    assert not first.drop(columns='ParcelID').equals(second.drop(columns='ParcelID'))
+
+
+def test_generated_columns_follow_business_rules():
+    df = generate_test_parcel_data(count=500, random_seed=3)
+
+    assert len(df) == 500
+    assert df['ParcelID'].tolist() == list(range(1, 501))
+    assert df['Acres'].between(0.1, 10.0).all()
+    assert df['AssessedValue'].between(100000, 1999999).all()
+    assert (df['SalePrice'] >= (df['AssessedValue'] * 0.8).astype(np.int64) - 1).all()
+    assert df['YearBuilt'].between(1950, 2023).all()
+
+    # Only residential parcels have bedrooms and bathrooms
+    residential = df['LandUse'] == 'Residential'
+    assert (df.loc[~residential, ['Bedrooms', 'Bathrooms']] == 0).all().all()
+    assert df.loc[residential, 'Bedrooms'].between(1, 5).all()
+    assert df.loc[residential, 'Bathrooms'].between(1, 3).all()
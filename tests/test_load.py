@@ -0,0 +1,87 @@
+"""
+Tests for loading the Stats and Working SQLite databases.
+"""
+import sys
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('geopandas')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from etl.load import (
+    create_stats_db, load_stats_data,
+    create_working_db, load_working_data
+)
+
+
+def read_rows(db_file, table):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+def read_indices(db_file, table):
+    conn = sqlite3.connect(db_file)
+    try:
+        return {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+    finally:
+        conn.close()
+
+
+def test_load_stats_data_accepts_string_ids(tmp_path):
+    """Non-integer ids are stored as given"""
+    df = pd.DataFrame({
+        'id': ['P-001', 'P-002'],
+        'use_code': ['RES', 'COM'],
+        'acres': [1.5, 2.0],
+        'assessed_value': [150000.0, 200000.0]
+    })
+    db_file = create_stats_db(str(tmp_path / 'stats.sqlite'))
+    load_stats_data(df, db_file)
+
+    assert read_rows(db_file, 'stats') == [
+        ('P-001', 'RES', 1.5, 150000.0),
+        ('P-002', 'COM', 2.0, 200000.0)
+    ]
+    assert {'idx_id', 'idx_use_code'} <= read_indices(db_file, 'stats')
+
+
+def test_load_working_data_accepts_duplicate_ids(tmp_path):
+    """Duplicate ids are loaded rather than rejected"""
+    df = pd.DataFrame({
+        'id': [1, 1, 2],
+        'owner': ['Alice', 'Alice', 'Bob'],
+        'use_code': ['RES', 'RES', 'COM']
+    })
+    db_file = create_working_db(str(tmp_path / 'working.sqlite'))
+    load_working_data(df, db_file)
+
+    assert read_rows(db_file, 'working') == [
+        (1, 'Alice', 'RES'),
+        (1, 'Alice', 'RES'),
+        (2, 'Bob', 'COM')
+    ]
+    assert {'idx_id', 'idx_owner', 'idx_use_code'} <= read_indices(db_file, 'working')
+
+
+def test_reload_replaces_rows_and_keeps_rollback_journal(tmp_path):
+    """A second load replaces the rows, and output files are not switched to WAL"""
+    db_file = create_working_db(str(tmp_path / 'working.sqlite'))
+    load_working_data(pd.DataFrame({'id': [1], 'owner': ['Alice'], 'use_code': ['RES']}), db_file)
+    load_working_data(pd.DataFrame({'id': [2], 'owner': ['Bob'], 'use_code': ['COM']}), db_file)
+
+    assert read_rows(db_file, 'working') == [(2, 'Bob', 'COM')]
+    conn = sqlite3.connect(db_file)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] != 'wal'
+    finally:
+        conn.close()
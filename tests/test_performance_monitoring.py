@@ -0,0 +1,82 @@
+"""
+Tests for the CI/CD performance report.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from ci_cd.performance_monitoring import generate_performance_report
+
+
+def job_rows():
+    return pd.DataFrame({
+        'id': [1, 2, 3],
+        'job_name': ['a', 'b', 'c'],
+        'start_time': pd.to_datetime(['2024-01-01 12:00:00', '2024-01-02 12:00:00', '2024-01-03 12:00:00']),
+        'end_time': pd.to_datetime(['2024-01-01 12:00:30', '2024-01-02 12:00:05', '2024-01-03 12:01:00']),
+        'status': ['completed', 'failed', 'failed'],
+        'record_count': [100, 0, 0],
+        'extraction_time': [10.0, 1.0, 1.0],
+        'transformation_time': [5.0, None, None],
+        'loading_time': [15.0, None, None],
+        'peak_memory_usage': [200.0, 50.0, 50.0],
+    })
+
+
+def test_report_counts_statuses_from_jobs_without_status_counts(tmp_path):
+    """Callers that build only {'jobs', 'metrics'} still get counts and completed-only averages"""
+    summary = generate_performance_report(
+        {'jobs': job_rows(), 'metrics': pd.DataFrame()}, output_dir=str(tmp_path)
+    )
+
+    assert summary['total_jobs'] == 3
+    assert summary['successful_jobs'] == 1
+    assert summary['failed_jobs'] == 2
+    assert summary['avg_duration'] == pytest.approx(30.0)
+    assert summary['avg_memory_usage'] == pytest.approx(200.0)
+    assert [point['job_id'] for point in summary['record_count_trend']] == [1]
+
+
+def test_report_uses_status_counts_when_given(tmp_path):
+    jobs = job_rows()
+    data = {
+        'jobs': jobs[jobs['status'] == 'completed'].reset_index(drop=True),
+        'status_counts': pd.DataFrame({'status': ['completed', 'failed'], 'job_count': [4, 6]}),
+        'metrics': pd.DataFrame(),
+    }
+    summary = generate_performance_report(data, output_dir=str(tmp_path))
+
+    assert summary['total_jobs'] == 10
+    assert summary['successful_jobs'] == 4
+    assert summary['failed_jobs'] == 6
+    assert summary['avg_duration'] == pytest.approx(30.0)
+
+
+def test_report_without_jobs_has_no_data(tmp_path):
+    summary = generate_performance_report(
+        {'jobs': pd.DataFrame(), 'metrics': pd.DataFrame()}, output_dir=str(tmp_path)
+    )
+    assert summary['status'] == 'no_data'
+
+
+def test_trend_timestamps_match_isoformat(tmp_path):
+    """Microseconds are only included when they are non-zero, as with isoformat()"""
+    jobs = job_rows()
+    jobs.loc[0, 'start_time'] = pd.Timestamp('2024-01-01 12:00:00.250000')
+    summary = generate_performance_report(
+        {'jobs': jobs, 'metrics': pd.DataFrame()}, output_dir=str(tmp_path)
+    )
+    assert summary['record_count_trend'][0]['timestamp'] == '2024-01-01T12:00:00.250000'
+
+    summary = generate_performance_report(
+        {'jobs': job_rows(), 'metrics': pd.DataFrame()}, output_dir=str(tmp_path)
+    )
+    assert summary['record_count_trend'][0]['timestamp'] == '2024-01-01T12:00:00'
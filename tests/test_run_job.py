@@ -0,0 +1,48 @@
+"""
+Tests for job state persistence in the run_job route.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('geopandas')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def test_failed_stage_persists_failed_status_and_metric(flask_app, monkeypatch):
+    import etl.sync
+    from models import ETLJob, PerformanceMetric
+
+    def failing_extract(batch_size=1000):
+        raise RuntimeError("extraction exploded")
+
+    monkeypatch.setattr(etl.sync, 'extract_data', failing_extract)
+
+    with flask_app.app.app_context():
+        job = ETLJob(job_name='failing job', source_type='sql_server')
+        flask_app.db.session.add(job)
+        flask_app.db.session.commit()
+        job_id = job.id
+
+    response = flask_app.app.test_client().get(f'/run-job/{job_id}')
+    assert response.status_code == 302
+
+    # Read back through a new session so only committed state is seen
+    with flask_app.app.app_context():
+        flask_app.db.session.remove()
+        job = flask_app.db.session.get(ETLJob, job_id)
+        assert job.status == 'failed'
+        assert 'extraction exploded' in job.error_message
+
+        stages = [
+            metric.stage
+            for metric in PerformanceMetric.query.filter_by(job_id=job_id).all()
+        ]
+        assert 'extraction' in stages
+        assert 'failure' in stages
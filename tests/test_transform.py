@@ -0,0 +1,62 @@
+"""
+Tests for transforming extracted parcel data into a GeoDataFrame.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+shapely = pytest.importorskip('shapely')
+pytest.importorskip('geopandas')
+
+# Add the project root to the Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from etl.transform import transform_data
+
+
+def test_transform_parses_wkt_column():
+    wkt = ['POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))', None, 'POINT (2 3)']
+    df = pd.DataFrame({'parcel_id': ['P1', 'P2', 'P3'], 'geometry': wkt})
+
+    gdf = transform_data(df)
+
+    # Rows without geometry are dropped before parsing
+    assert gdf['parcel_id'].tolist() == ['P1', 'P3']
+    assert gdf.crs == 'EPSG:4326'
+    assert shapely.equals(gdf.geometry.values, shapely.from_wkt([wkt[0], wkt[2]])).all()
+
+
+def test_transform_keeps_empty_wkt_as_missing_geometry():
+    df = pd.DataFrame({'parcel_id': ['P1', 'P2'], 'geometry': ['POINT (1 1)', '']})
+
+    gdf = transform_data(df)
+
+    assert len(gdf) == 2
+    assert gdf.geometry.isna().tolist() == [False, True]
+
+
+def test_transform_accepts_geometries():
+    from etl.test_data import generate_test_parcel_data
+
+    wkt_gdf = transform_data(generate_test_parcel_data(count=25, random_seed=7))
+    geometry_gdf = transform_data(generate_test_parcel_data(count=25, random_seed=7, wkt=False))
+
+    assert len(wkt_gdf) == len(geometry_gdf) == 25
+    assert wkt_gdf.crs == geometry_gdf.crs
+    assert wkt_gdf.geometry.geom_equals(geometry_gdf.geometry).all()
+
+
+def test_generated_geometries_match_wkt():
+    from etl.test_data import generate_test_parcel_data
+
+    wkt = generate_test_parcel_data(count=25, random_seed=7)
+    geometries = generate_test_parcel_data(count=25, random_seed=7, wkt=False)
+    pd.testing.assert_frame_equal(wkt.drop(columns='geometry'), geometries.drop(columns='geometry'))
+    assert shapely.is_geometry(geometries['geometry'].to_numpy()).all()
+    assert shapely.equals(
+        shapely.from_wkt(wkt['geometry'].to_numpy()), geometries['geometry'].to_numpy()
+    ).all()